@@ -1,37 +1,173 @@
-import requests
-from datetime import date
-import geocoder
+import json
+import os
+import threading
+import calendar
+from datetime import date, datetime, timedelta
+import astro
+import gazetteer
+import geo
+import cache
+import http_client
+import metrics
+import paths
+
+# Overridable so tests and benchmarks can point at a local stand-in
+API_BASE = os.getenv("ALADHAN_API", "http://api.aladhan.com/v1")
+VERSION_URL = os.getenv("PRAYER_VERSION_URL", "https://raw.githubusercontent.com/MH7Q/prayer-time-cli/refs/heads/main/version.txt")
+PREFETCH_DAYS = 3  # start pulling next month this close to month end
+
+_prefetching = set()
+_prefetch_lock = threading.Lock()
 
 def get_current_location():
     try:
+        import geocoder
         # Detects location based on IP
         g = geocoder.ip('me')
         if g.city and g.country:
             return f"{g.city}, {g.country}"
     except:
         pass
+    # Offline: guess from the machine's timezone
+    place = gazetteer.from_timezone(gazetteer.host_timezone())
+    if place:
+        return gazetteer.display(place)
     return "Riyadh, Saudi Arabia"
 
-def fetch_prayer_times(city):
-    today = date.today().strftime("%d-%m-%Y")
-    url = f"http://api.aladhan.com/v1/timingsByAddress?address={city}&date={today}"
-    
+def fetch_month(city, year, month, method=astro.DEFAULT_METHOD):
+    """
+    Returns the list of daily `data` objects for a whole month, or None if the
+    address is unknown. Network errors are raised to the caller.
+    """
+    loc = astro.resolve_location(city)
+    if loc:
+        lat, lon, tz = loc
+        return astro.compute_month(lat, lon, year, month, tz, [method])[method]
+
+    url = f"{API_BASE}/calendarByAddress/{year}/{month}"
+    with metrics.timed("fetch_month", "Whole-month downloads including parsing"):
+        res = http_client.get(url, params={'address': city, 'method': method}, timeout=10, deadline=30)
+        data = res.json()
+    if res.status_code != 200 or data.get('code') != 200:
+        return None
+    days = data['data']
+    cache.put_many(city, method, [(_day_of(d), d) for d in days])
+    return days
+
+def fetch_month_methods(city, year, month, methods):
+    """
+    {method: days} for comparing calculation methods. Offline addresses are
+    computed in one pass, others take one whole-month request per method.
+    """
+    loc = astro.resolve_location(city)
+    if loc:
+        lat, lon, tz = loc
+        return astro.compute_month(lat, lon, year, month, tz, methods)
+    out = {}
+    for m in methods:
+        days = fetch_month(city, year, month, m)
+        if days is None:
+            return None
+        out[m] = days
+    return out
+
+def fetch_day(city, day=None, method=astro.DEFAULT_METHOD, prefetch=True):
+    """
+    Returns one day's `data` object, or None if the address is unknown.
+    A cache miss pulls the whole month in a single request.
+    """
+    day = day or date.today()
+    loc = astro.resolve_location(city)
+    if loc:
+        lat, lon, tz = loc
+        return astro.compute_timings(lat, lon, day, tz, method)
+
+    with metrics.timed("cache_get", "Timings cache lookup time"):
+        data = cache.get(city, day, method)
+    if data is None:
+        days = fetch_month(city, day.year, day.month, method)
+        if days is None:
+            return None
+        data = next((d for d in days if _day_of(d) == day), None)
+    if prefetch:
+        _maybe_prefetch(city, day, method)
+    return data
+
+def fetch_today(city, method=astro.DEFAULT_METHOD):
+    """Today's `data` at the address itself, which near midnight isn't always the host's today."""
+    data = fetch_day(city, date.today(), method)
+    if data:
+        day = geo.now_in(data['meta'].get('timezone')).date()
+        if day != date.today():
+            data = fetch_day(city, day, method) or data
+    return data
+
+def fetch_prayer_times(city, method=astro.DEFAULT_METHOD, day=None):
     try:
-        res = requests.get(url, timeout=10)
-        if res.status_code == 200:
-            return res.json()['data']
+        return fetch_day(city, day, method) if day else fetch_today(city, method)
     except Exception as e:
+        metrics.inc("api_errors_total", 1, "Failed timings fetches in the tray app")
         print(f"API Error: {e}")
     return None
 
+def _day_of(data):
+    return datetime.strptime(data['date']['gregorian']['date'], "%d-%m-%Y").date()
+
+def _maybe_prefetch(city, day, method):
+    last = calendar.monthrange(day.year, day.month)[1]
+    if last - day.day >= PREFETCH_DAYS:
+        return
+    nxt = date(day.year, day.month, last) + timedelta(days=1)
+    key = (city.strip().lower(), nxt.year, nxt.month, method)
+    with _prefetch_lock:
+        if key in _prefetching or cache.has(city, nxt, method):
+            return
+        _prefetching.add(key)
+
+    def run():
+        try:
+            fetch_month(city, nxt.year, nxt.month, method)
+        except Exception:
+            pass
+        finally:
+            with _prefetch_lock: _prefetching.discard(key)
+
+    # A daemon: a CLI run that exits first just skips the prefetch rather
+    # than hanging on a slow or offline network
+    threading.Thread(target=run, daemon=True).start()
+
+def _version_state_path():
+    return os.path.join(paths.cache_dir(), "version.json")
+
 def check_version_mismatch(current_version):
-    url = "https://raw.githubusercontent.com/MH7Q/prayer-time-cli/refs/heads/main/version.txt"
+    """
+    The published version if it differs from ours, else None. The last
+    answer is kept with its ETag, so an unchanged file costs a bodyless 304.
+    """
+    try:
+        with open(_version_state_path(), encoding="utf-8") as f:
+            saved = json.load(f)
+    except (OSError, ValueError):
+        saved = {}
     try:
-        res = requests.get(url, timeout=5)
-        if res.status_code == 200:
+        headers = {'If-None-Match': saved['etag']} if saved.get('etag') else None
+        res = http_client.get(VERSION_URL, headers=headers, timeout=5, retries=1)
+        if res.status_code == 304:
+            metrics.inc("version_not_modified_total", 1, "Version checks answered from the saved ETag")
+            remote_ver = saved.get('version', "")
+        elif res.status_code == 200:
             remote_ver = res.text.strip()
-            if remote_ver != current_version and len(remote_ver) < 10:
-                return remote_ver
+            if res.headers.get('ETag'):
+                path = _version_state_path()
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp = f"{path}.{os.getpid()}.tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump({'etag': res.headers['ETag'], 'version': remote_ver}, f)
+                os.replace(tmp, path)
+        else:
+            return None
+        if remote_ver and remote_ver != current_version and len(remote_ver) < 10:
+            return remote_ver
     except:
         pass
-    return None
\ No newline at end of file
+    return None
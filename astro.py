@@ -0,0 +1,276 @@
+import calendar
+import math
+import sys
+from datetime import date, datetime
+import gazetteer
+import geo
+import hijri
+
+# --- Offline prayer time engine ---
+# Solar position math follows the classic PrayTimes.org formulation, so the
+# results line up with what api.aladhan.com returns for the same method.
+
+# Method ids match aladhan's `method` parameter. Numbers are twilight angles
+# in degrees, strings ending in "min" are offsets in minutes.
+METHODS = {
+    0: {"name": "Shia Ithna-Ansari", "fajr": 16, "isha": 14, "maghrib": 4, "midnight": "jafari"},
+    1: {"name": "University of Islamic Sciences, Karachi", "fajr": 18, "isha": 18},
+    2: {"name": "Islamic Society of North America (ISNA)", "fajr": 15, "isha": 15},
+    3: {"name": "Muslim World League", "fajr": 18, "isha": 17},
+    4: {"name": "Umm Al-Qura University, Makkah", "fajr": 18.5, "isha": "90 min"},
+    5: {"name": "Egyptian General Authority of Survey", "fajr": 19.5, "isha": 17.5},
+    7: {"name": "Institute of Geophysics, University of Tehran", "fajr": 17.7, "isha": 14, "maghrib": 4.5, "midnight": "jafari"},
+    8: {"name": "Gulf Region", "fajr": 19.5, "isha": "90 min"},
+    9: {"name": "Kuwait", "fajr": 18, "isha": 17.5},
+    10: {"name": "Qatar", "fajr": 18, "isha": "90 min"},
+    11: {"name": "Majlis Ugama Islam Singapura, Singapore", "fajr": 20, "isha": 18},
+    12: {"name": "Union Organization Islamic de France", "fajr": 12, "isha": 12},
+    13: {"name": "Diyanet Isleri Baskanligi, Turkey", "fajr": 18, "isha": 17},
+    14: {"name": "Spiritual Administration of Muslims of Russia", "fajr": 16, "isha": 15},
+    16: {"name": "Dubai", "fajr": 18.2, "isha": 18.2},
+    17: {"name": "Jabatan Kemajuan Islam Malaysia (JAKIM)", "fajr": 20, "isha": 18},
+    18: {"name": "Tunisia", "fajr": 18, "isha": 18},
+    19: {"name": "Algeria", "fajr": 18, "isha": 17},
+    20: {"name": "Kementerian Agama Republik Indonesia", "fajr": 20, "isha": 18},
+    21: {"name": "Morocco", "fajr": 19, "isha": 17},
+    23: {"name": "Ministry of Awqaf, Jordan", "fajr": 18, "isha": 18},
+}
+DEFAULT_METHOD = 4
+# Below this many (day, method) cells the pure Python loop beats paying ~100 ms
+# to import numpy for vectorized.py
+VECTOR_MIN_CELLS = 2000
+
+PRAYER_ORDER = ['Fajr', 'Sunrise', 'Dhuhr', 'Asr', 'Sunset', 'Maghrib', 'Isha', 'Imsak', 'Midnight']
+
+# --- Degree based trigonometry ---
+def _dsin(d): return math.sin(math.radians(d))
+def _dcos(d): return math.cos(math.radians(d))
+def _dtan(d): return math.tan(math.radians(d))
+def _darcsin(x): return math.degrees(math.asin(x))
+def _darccos(x): return math.degrees(math.acos(x))
+def _darctan2(y, x): return math.degrees(math.atan2(y, x))
+def _darccot(x): return math.degrees(math.atan(1 / x))
+def _fix(a, b): return a if math.isnan(a) else a - b * math.floor(a / b)
+
+def julian_day(year, month, day):
+    if month <= 2:
+        year -= 1; month += 12
+    a = year // 100
+    b = 2 - a + a // 4
+    return math.floor(365.25 * (year + 4716)) + math.floor(30.6001 * (month + 1)) + day + b - 1524.5
+
+def sun_position(jd):
+    """Returns (declination, equation of time in hours) for a julian day."""
+    d = jd - 2451545.0
+    g = _fix(357.529 + 0.98560028 * d, 360)
+    q = _fix(280.459 + 0.98564736 * d, 360)
+    lam = _fix(q + 1.915 * _dsin(g) + 0.020 * _dsin(2 * g), 360)
+    e = 23.439 - 0.00000036 * d
+    ra = _fix(_darctan2(_dcos(e) * _dsin(lam), _dcos(lam)) / 15, 24)
+    eqt = q / 15 - ra
+    decl = _darcsin(_dsin(e) * _dsin(lam))
+    return decl, eqt
+
+def tz_offset(tz, day):
+    """
+    Hours east of UTC for `tz` (IANA name, number or None for the host clock)
+    on `day`. Raises ValueError for a zone the system has no data for, rather
+    than computing with the host's offset under the zone's name.
+    """
+    if isinstance(tz, (int, float)):
+        return float(tz)
+    noon = datetime(day.year, day.month, day.day, 12)
+    if tz:
+        from zoneinfo import ZoneInfo
+        try:
+            zone = ZoneInfo(tz)
+        except Exception:
+            raise ValueError(f"Unknown timezone {tz!r} (is tzdata installed?)") from None
+        return zone.utcoffset(noon).total_seconds() / 3600
+    return noon.astimezone().utcoffset().total_seconds() / 3600
+
+def _parse_param(value):
+    if isinstance(value, str) and value.endswith("min"):
+        return float(value.split()[0]), True
+    return float(value), False
+
+def _compute_hours(lat, lon, day, method, school):
+    jd = julian_day(day.year, day.month, day.day) - lon / (15 * 24)
+
+    def mid_day(t):
+        return _fix(12 - sun_position(jd + t)[1], 24)
+
+    def angle_time(angle, t, ccw=False):
+        decl = sun_position(jd + t)[0]
+        x = (-_dsin(angle) - _dsin(decl) * _dsin(lat)) / (_dcos(decl) * _dcos(lat))
+        if x < -1 or x > 1:
+            return float('nan')
+        diff = _darccos(x) / 15
+        return mid_day(t) + (-diff if ccw else diff)
+
+    def asr_time(factor, t):
+        decl = sun_position(jd + t)[0]
+        return angle_time(-_darccot(factor + _dtan(abs(lat - decl))), t)
+
+    fajr_angle, _ = _parse_param(method["fajr"])
+    isha_value, isha_minutes = _parse_param(method["isha"])
+    maghrib_angle = method.get("maghrib")
+
+    # Initial guesses are day portions around each event
+    times = {}
+    times['Fajr'] = angle_time(fajr_angle, 5 / 24, ccw=True)
+    times['Sunrise'] = angle_time(0.833, 6 / 24, ccw=True)
+    times['Dhuhr'] = mid_day(12 / 24)
+    times['Asr'] = asr_time(2 if school == 1 else 1, 13 / 24)
+    times['Sunset'] = angle_time(0.833, 18 / 24)
+    times['Maghrib'] = angle_time(maghrib_angle, 18 / 24) if maghrib_angle else times['Sunset']
+    times['Isha'] = float('nan') if isha_minutes else angle_time(isha_value, 18 / 24)
+    return times
+
+def _adjust_high_latitudes(times, method):
+    # Angle based rule, aladhan's default latitudeAdjustmentMethod
+    night = _fix(times['Sunrise'] - times['Sunset'], 24)
+    fajr_angle, _ = _parse_param(method["fajr"])
+    portion = fajr_angle / 60 * night
+    if math.isnan(times['Fajr']) or _fix(times['Sunrise'] - times['Fajr'], 24) > portion:
+        times['Fajr'] = times['Sunrise'] - portion
+    isha_value, isha_minutes = _parse_param(method["isha"])
+    if not isha_minutes:
+        portion = isha_value / 60 * night
+        if math.isnan(times['Isha']) or _fix(times['Isha'] - times['Sunset'], 24) > portion:
+            times['Isha'] = times['Sunset'] + portion
+    if method.get("maghrib"):
+        portion = method["maghrib"] / 60 * night
+        if math.isnan(times['Maghrib']) or _fix(times['Maghrib'] - times['Sunset'], 24) > portion:
+            times['Maghrib'] = times['Sunset'] + portion
+
+def format_hours(hours):
+    if math.isnan(hours):
+        return "--:--"
+    minutes = int(math.floor(_fix(hours, 24) * 60 + 0.5)) % 1440
+    return f"{minutes // 60:02}:{minutes % 60:02}"
+
+def compute_hours(lat, lon, day, tz=None, method=DEFAULT_METHOD, school=0, ramadan=False):
+    """Prayer times for one day as fractional local hours, keyed like aladhan timings."""
+    m = METHODS.get(method, METHODS[DEFAULT_METHOD])
+    times = _compute_hours(lat, lon, day, m, school)
+    offset = tz_offset(tz, day) - lon / 15
+    for k in times:
+        times[k] += offset
+    if not math.isnan(times['Sunrise']) and not math.isnan(times['Sunset']):
+        _adjust_high_latitudes(times, m)
+
+    isha_value, isha_minutes = _parse_param(m["isha"])
+    if isha_minutes:
+        # Umm al-Qura extends Isha to two hours after Maghrib during Ramadan
+        if ramadan and method == 4:
+            isha_value = 120
+        times['Isha'] = times['Maghrib'] + isha_value / 60
+
+    times['Imsak'] = times['Fajr'] - 10 / 60
+    until = times['Fajr'] if m.get("midnight") == "jafari" else times['Sunrise']
+    times['Midnight'] = times['Sunset'] + _fix(until - times['Sunset'], 24) / 2
+    return times
+
+def compute_timings(lat, lon, day=None, tz=None, method=DEFAULT_METHOD, school=0, ramadan=None, hours=None):
+    """
+    Computes a day's prayer times locally and returns them in the same shape
+    as the `data` object of aladhan's timings endpoints. `hours` skips the
+    computation when the caller already has compute_hours()' result.
+    `ramadan` defaults to the local Umm al-Qura calendar.
+    """
+    day = day or date.today()
+    if hours is None:
+        if ramadan is None:
+            ramadan = method == 4 and hijri.is_ramadan(day)
+        hours = compute_hours(lat, lon, day, tz, method, school, ramadan)
+    m = METHODS.get(method, METHODS[DEFAULT_METHOD])
+    midnight = datetime(day.year, day.month, day.day)
+    return {
+        'timings': {k: format_hours(hours[k]) for k in PRAYER_ORDER},
+        'date': {
+            'readable': day.strftime("%d %b %Y"),
+            'timestamp': str(int(midnight.timestamp())),
+            'gregorian': {
+                'date': day.strftime("%d-%m-%Y"),
+                'format': "DD-MM-YYYY",
+                'day': day.strftime("%d"),
+                'weekday': {'en': day.strftime("%A")},
+                'month': {'number': day.month, 'en': day.strftime("%B")},
+                'year': str(day.year),
+            },
+            'hijri': hijri.describe(day),
+        },
+        'meta': {
+            'latitude': lat,
+            'longitude': lon,
+            'timezone': tz if isinstance(tz, str) else "UTC%+g" % tz_offset(tz, day),
+            'method': {
+                'id': method,
+                'name': m["name"],
+                'params': {'Fajr': m["fajr"], 'Isha': m["isha"]},
+            },
+            'latitudeAdjustmentMethod': "ANGLE_BASED",
+            'midnightMode': "JAFARI" if m.get("midnight") == "jafari" else "STANDARD",
+            'school': "HANAFI" if school == 1 else "STANDARD",
+        },
+    }
+
+def compute_days(lat, lon, days, tz=None, methods=(DEFAULT_METHOD,), school=0):
+    """
+    {method: [data for each day]} for one location. Large jobs go through
+    vectorized.py in a single pass when numpy is installed.
+    """
+    methods = list(methods)
+    grid = None
+    if "numpy" in sys.modules or len(days) * len(methods) >= VECTOR_MIN_CELLS:
+        try:
+            import vectorized
+            ramadan = [h is not None and h[1] == hijri.RAMADAN for h in hijri.to_hijri_many(days)] if 4 in methods else False
+            grid = vectorized.compute(days, [(lat, lon, tz)], methods, school, ramadan)
+        except ImportError:
+            pass
+    out = {}
+    for k, m in enumerate(methods):
+        if grid is None:
+            out[m] = [compute_timings(lat, lon, d, tz, m, school) for d in days]
+        else:
+            out[m] = [compute_timings(lat, lon, d, tz, m, school, hours={p: float(grid[p][i, 0, k]) for p in grid})
+                      for i, d in enumerate(days)]
+    return out
+
+def compute_month(lat, lon, year, month, tz=None, methods=(DEFAULT_METHOD,), school=0):
+    days = [date(year, month, d) for d in range(1, calendar.monthrange(year, month)[1] + 1)]
+    return compute_days(lat, lon, days, tz, methods, school)
+
+def resolve_location(address):
+    """
+    Turns an address into (lat, lon, timezone) without the network.
+    Accepts "lat,lon" pairs (timezone from the bundled grid) or anything the
+    bundled gazetteer knows; returns None otherwise, including for points
+    too close to a timezone border to call and zones this system has no
+    data for, so the API answers instead.
+    """
+    if not address:
+        return None
+    parts = [p.strip() for p in address.split(",")]
+    if len(parts) == 2:
+        try:
+            lat, lon = float(parts[0]), float(parts[1])
+        except ValueError:
+            pass
+        else:
+            return _checked(lat, lon, geo.timezone_at(lat, lon))
+    place = gazetteer.resolve(address)
+    if place:
+        return _checked(place.lat, place.lon, place.tz)
+    return None
+
+def _checked(lat, lon, tz):
+    if not tz:
+        return None
+    try:
+        tz_offset(tz, date.today())
+    except ValueError:
+        return None
+    return lat, lon, tz
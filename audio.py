@@ -0,0 +1,96 @@
+import os
+import sys
+import threading
+import metrics
+
+# --- Adhan playback ---
+# Nothing audio related is loaded at startup. The scheduler sends a
+# "prewarm" event shortly before each prayer: the mixer starts and the whole
+# file is decoded into a PCM buffer in the background, so play() starts
+# instantly. Once playback ends (or if it never happens) the buffer and the
+# audio device are released again, so the app holds no audio memory between
+# prayers.
+
+ADHAN_FILE = "adhan.mp3"
+IDLE_RELEASE = 600  # seconds a warmed buffer may wait for play() before it is freed
+
+_lock = threading.Lock()
+_sound = None
+_channel = None
+_timer = None
+
+def _load(path):
+    # Caller holds _lock
+    global _sound
+    if _sound is not None:
+        return True
+    if not os.path.exists(path):
+        return False
+    with metrics.timed("audio_init", "Mixer start and adhan decode"):
+        try:
+            import pygame
+            if not pygame.mixer.get_init(): pygame.mixer.init()
+            _sound = pygame.mixer.Sound(path)  # decodes the whole file up front
+        except Exception:
+            _sound = None
+    return _sound is not None
+
+def prewarm(path=ADHAN_FILE):
+    """Decodes the adhan on a background thread. Returns immediately."""
+    def run():
+        with _lock:
+            if _load(path): _release_in(IDLE_RELEASE)
+    threading.Thread(target=run, daemon=True).start()
+
+def play(path=ADHAN_FILE):
+    """Plays the adhan, decoding it first if prewarm() didn't. Returns False if it can't."""
+    global _channel
+    with _lock:
+        if not _load(path):
+            return False
+        try:
+            _channel = _sound.play()
+        except Exception:
+            return False
+        _release_in(_sound.get_length() + 1)
+    return True
+
+def _release_in(seconds):
+    global _timer
+    if _timer: _timer.cancel()
+    _timer = threading.Timer(seconds, _release_when_done)
+    _timer.daemon = True
+    _timer.start()
+
+def _release_when_done():
+    if is_playing():
+        _release_in(5)
+    else:
+        release()
+
+def release():
+    """Frees the decoded buffer and closes the audio device."""
+    global _sound, _channel, _timer
+    with _lock:
+        if _timer: _timer.cancel()
+        _sound = _channel = _timer = None
+        pygame = sys.modules.get("pygame")
+        if pygame is None: return
+        try: pygame.mixer.quit()
+        except Exception: pass
+
+def stop():
+    channel = _channel
+    if channel is not None:
+        try: channel.stop()
+        except Exception: pass
+    release()
+
+def is_playing():
+    channel = _channel
+    if channel is None: return False
+    try: return channel.get_busy()
+    except Exception: return False
+
+def is_loaded():
+    return _sound is not None
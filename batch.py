@@ -0,0 +1,74 @@
+import csv
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
+from datetime import date
+import api
+import astro
+
+# --- Batch mode ---
+# Resolves a list of addresses with a bounded worker pool and writes each
+# result as soon as it is ready. At most `workers * 2` addresses are in
+# flight, so memory stays flat however long the input is.
+
+PRAYERS = ['Fajr', 'Sunrise', 'Dhuhr', 'Asr', 'Maghrib', 'Isha']
+CSV_FIELDS = ['address', 'date'] + PRAYERS + ['timezone', 'error']
+
+def read_addresses(stream):
+    for line in stream:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            yield line
+
+def _resolve(address, day, method):
+    try:
+        data = api.fetch_day(address, day, method, prefetch=False)
+        if data is None:
+            return {'address': address, 'date': day.isoformat(), 'error': "location not found"}
+        return {'address': address, 'date': day.isoformat(),
+                'timings': {p: data['timings'][p][:5] for p in PRAYERS},
+                'timezone': data['meta'].get('timezone')}
+    except Exception as e:
+        return {'address': address, 'date': day.isoformat(), 'error': str(e)}
+
+class _CsvWriter:
+    def __init__(self, out):
+        self.w = csv.DictWriter(out, fieldnames=CSV_FIELDS)
+        self.w.writeheader()
+    def write(self, row):
+        self.w.writerow({'address': row['address'], 'date': row['date'], **row.get('timings', {}),
+                         'timezone': row.get('timezone', ''), 'error': row.get('error', '')})
+
+class _JsonlWriter:
+    def __init__(self, out):
+        self.out = out
+    def write(self, row):
+        self.out.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+WRITERS = {'csv': _CsvWriter, 'jsonl': _JsonlWriter}
+
+def run_batch(addresses, out=sys.stdout, fmt='csv', workers=8, day=None, method=astro.DEFAULT_METHOD):
+    """
+    Streams one row per address to `out` in completion order.
+    Returns (ok, failed) counts.
+    """
+    day = day or date.today()
+    writer = WRITERS[fmt](out)
+    counts = {'ok': 0, 'failed': 0}
+
+    def emit(futures):
+        for f in futures:
+            row = f.result()
+            writer.write(row)
+            counts['failed' if 'error' in row else 'ok'] += 1
+        out.flush()
+
+    pending = set()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for address in addresses:
+            pending.add(pool.submit(_resolve, address, day, method))
+            if len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                emit(done)
+        emit(as_completed(pending))
+    return counts['ok'], counts['failed']
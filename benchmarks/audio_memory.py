@@ -0,0 +1,60 @@
+"""
+Memory held by adhan playback, old always-on mixer versus audio.py.
+
+    python benchmarks/audio_memory.py [--file adhan.mp3]
+
+Prints resident memory (current, not peak) after each step: start, pygame
+imported and the mixer started (what the app used to hold all day from
+startup), adhan decoded
+(the few minutes around a prayer) and after audio.release() (the rest of the
+day). Set SDL_AUDIODRIVER=dummy on machines without a sound card.
+"""
+import argparse
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+def rss_kb():
+    """Current resident set size, or None where it can't be read."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except OSError:
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss // 1024
+    except ImportError:
+        return None
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--file", default=os.path.join(ROOT, "adhan.mp3"))
+    args = parser.parse_args()
+    import importlib.util
+    if importlib.util.find_spec("pygame") is None:
+        print("pygame is not installed, nothing to measure"); return
+    if not os.path.exists(args.file):
+        print(f"{args.file} not found"); return
+
+    import audio
+    steps = [("start", rss_kb())]
+    import pygame
+    pygame.mixer.init()
+    steps.append(("pygame + mixer (old startup)", rss_kb()))
+    with audio._lock:
+        audio._load(args.file)
+    steps.append(("adhan decoded (prewarmed)", rss_kb()))
+    audio.release()
+    steps.append(("released (between prayers)", rss_kb()))
+
+    base = steps[0][1]
+    for name, kb in steps:
+        print(f"{name:<30}{kb:>10} KB   {kb - base:>+8} KB")
+    print(f"\nstartup saving      {steps[1][1] - base:>8} KB  (nothing audio related loaded at launch)")
+    print(f"steady-state saving {steps[1][1] - steps[3][1]:>8} KB  (after the first prayer; the pygame modules stay imported)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""
+Hot path benchmarks, runnable offline against benchmarks/fake_aladhan.py.
+
+    python benchmarks/bench.py -o results.json
+    python benchmarks/bench.py -o new.json --compare results.json
+
+Each benchmark reports ops/sec and p50/p99 latency; the run also records
+peak RSS. Results are JSON so two commits can be compared directly.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+NETWORK_ADDRESS = "Benchmark Town"  # not in the gazetteer, so it takes the HTTP path
+
+def measure(fn, min_time=0.5, max_iter=100000, min_iter=5):
+    """Calls fn until min_time has passed, returns ops/sec and latency percentiles in microseconds."""
+    samples = []
+    clock = time.perf_counter
+    end = clock() + min_time
+    while len(samples) < min_iter or (clock() < end and len(samples) < max_iter):
+        t0 = clock()
+        fn()
+        samples.append(clock() - t0)
+    samples.sort()
+    pick = lambda q: round(samples[min(len(samples) - 1, int(len(samples) * q))] * 1e6, 2)
+    return {"iterations": len(samples), "ops_per_sec": round(len(samples) / sum(samples), 1),
+            "p50_us": pick(0.50), "p99_us": pick(0.99)}
+
+def peak_rss_kb():
+    try:
+        import resource
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss // 1024 if sys.platform == "darwin" else rss
+    except ImportError:
+        return None
+
+class _Label:
+    """Stand-in for a Tk label when there is no display."""
+    def __init__(self): self.text = ""
+    def config(self, text=None, **kw): self.text = text
+    def cget(self, key): return self.text
+
+def _app():
+    """A PrayerApp with a loaded schedule: real Tk if possible, otherwise stub widgets."""
+    import main
+    import astro
+    today = date.today()
+    days = [(d, astro.compute_timings(24.7136, 46.6753, d, "Asia/Riyadh")['timings'])
+            for d in (today, today + timedelta(days=1))]
+    try:
+        import tkinter as tk
+        root = tk.Tk(); root.withdraw()
+        app = main.PrayerApp.__new__(main.PrayerApp)
+        app.root = root
+        app.cfg = {'lang': 'en', 'time_format': '12h', 'city': 'Riyadh'}
+        app.mini_win = app.settings_win = app.icon = None
+        app.sched = main.scheduler.Scheduler(lambda *a: None)
+        app.sched_job = app.clock_job = app.config_job = app.layout_dir = None
+        app.shown = {}
+        app.setup_ui()
+    except Exception:
+        app = main.PrayerApp.__new__(main.PrayerApp)
+        app.cfg = {'lang': 'en', 'time_format': '12h', 'city': 'Riyadh'}
+        app.shown = {}
+        app.lbl_next, app.lbl_timer = _Label(), _Label()
+        app.p_widgets = {p: (_Label(), _Label(), None) for p in ['Fajr', 'Sunrise', 'Dhuhr', 'Asr', 'Maghrib', 'Isha']}
+        app.sched = main.scheduler.Scheduler(lambda *a: None)
+    app.timings = days[0][1]
+    app.sched.load(days)
+    return app
+
+def run(min_time):
+    import fake_aladhan
+    server, base = fake_aladhan.start()
+    tmp = tempfile.mkdtemp()
+    os.environ["ALADHAN_API"] = base
+    os.environ["PRAYER_CACHE_DB"] = os.path.join(tmp, "timings.db")
+    os.environ["PRAYER_SCHEDULE_FILE"] = os.path.join(tmp, "schedule.json")
+    # The CLI runs below save -a/-l, keep that out of the real settings
+    os.environ["PRAYER_CONFIG"] = os.path.join(tmp, "config.json")
+
+    import api
+    import cache
+    import prayer_times_cli as cli
+    api.API_BASE = base
+
+    timings = fake_aladhan._day(date.today())['timings']
+    results = {}
+
+    results["convert_to_12h"] = measure(lambda: cli.convert_to_12h("17:24"), min_time)
+    results["get_next_prayer"] = measure(lambda: cli.get_next_prayer(timings, "en"), min_time)
+
+    app = _app()
+    results["update_countdown"] = measure(lambda: app.update_countdown(datetime.now()), min_time)
+    results["refresh_times"] = measure(app.refresh_times, min_time)
+
+    try:
+        import arabic_reshaper  # noqa: F401
+        import utils
+        results["fix_text_ar"] = measure(lambda: utils.fix_text("العصر", "ar"), min_time)
+    except ImportError:
+        results["fix_text_ar"] = {"skipped": "arabic_reshaper not installed"}
+
+    try:
+        import vectorized
+        import astro
+        year = [date(2026, 1, 1) + timedelta(days=i) for i in range(365)]
+        cities = [(24.7136, 46.6753, "Asia/Riyadh"), (30.0444, 31.2357, "Africa/Cairo"),
+                  (51.5074, -0.1278, "Europe/London"), (-6.2088, 106.8456, "Asia/Jakarta")]
+        results["vectorized_year_all_methods"] = measure(
+            lambda: vectorized.compute(year, cities, list(astro.METHODS)), min_time, max_iter=50)
+    except ImportError:
+        results["vectorized_year_all_methods"] = {"skipped": "numpy not installed"}
+
+    def monthly():
+        cache.clear()
+        with contextlib.redirect_stdout(io.StringIO()):
+            cli.generate_monthly_schedule(NETWORK_ADDRESS, "en")
+    cwd = os.getcwd(); os.chdir(tmp)
+    try:
+        results["generate_monthly_schedule"] = measure(monthly, min_time, max_iter=200)
+    finally:
+        os.chdir(cwd)
+
+    def full_cli():
+        subprocess.run([sys.executable, os.path.join(ROOT, "prayer_times_cli.py"), "-a", NETWORK_ADDRESS, "-l", "en"],
+                       cwd=tmp, env=os.environ, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+    results["cli_full_run"] = measure(full_cli, min_time, max_iter=30)
+
+    # Runs after full_cli, which leaves the precomputed schedule behind
+    def cli_next():
+        subprocess.run([sys.executable, os.path.join(ROOT, "prayer_times_cli.py"), "--next"],
+                       cwd=tmp, env=os.environ, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+    results["cli_next"] = measure(cli_next, min_time, max_iter=50)
+
+    server.shutdown()
+    return results
+
+def compare(new, old):
+    print(f"\n{'benchmark':<28}{'old ops/s':>14}{'new ops/s':>14}{'change':>10}")
+    for name, r in new["results"].items():
+        o = old["results"].get(name, {})
+        if "ops_per_sec" not in r or "ops_per_sec" not in o:
+            continue
+        change = (r["ops_per_sec"] / o["ops_per_sec"] - 1) * 100
+        print(f"{name:<28}{o['ops_per_sec']:>14,.1f}{r['ops_per_sec']:>14,.1f}{change:>+9.1f}%")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-o", "--output", default=None, help="write results JSON here")
+    parser.add_argument("--compare", default=None, help="previous results JSON to diff against")
+    parser.add_argument("--min-time", type=float, default=0.5, help="seconds per benchmark")
+    args = parser.parse_args()
+
+    results = run(args.min_time)
+    report = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "peak_rss_kb": peak_rss_kb(),
+        "results": results,
+    }
+    for name, r in results.items():
+        if "ops_per_sec" in r:
+            print(f"{name:<28}{r['ops_per_sec']:>14,.1f} ops/s   p50 {r['p50_us']:>10,.1f} us   p99 {r['p99_us']:>10,.1f} us")
+        else:
+            print(f"{name:<28}  skipped: {r['skipped']}")
+    print(f"peak RSS: {report['peak_rss_kb']} KB")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(report, json.load(f))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Local stand-in for api.aladhan.com, so benchmarks run offline.
+
+    python benchmarks/fake_aladhan.py --port 8765
+    ALADHAN_API=http://127.0.0.1:8765/v1 python prayer_times_cli.py -a Anywhere
+
+Every address resolves to Riyadh; responses are built by the local engine
+in aladhan's JSON shape.
+"""
+import argparse
+import calendar
+import json
+import os
+import sys
+import threading
+from datetime import date, datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import astro
+
+LAT, LON, TZ = 24.7136, 46.6753, "Asia/Riyadh"
+
+def _day(d):
+    return astro.compute_timings(LAT, LON, d, TZ)
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real service
+
+    def do_GET(self):
+        parts = urlparse(self.path).path.strip("/").split("/")
+        try:
+            if parts[-3:-2] == ["calendarByAddress"]:
+                y, m = int(parts[-2]), int(parts[-1])
+                body = {"code": 200, "status": "OK",
+                        "data": [_day(date(y, m, d)) for d in range(1, calendar.monthrange(y, m)[1] + 1)]}
+            elif parts[-2:-1] == ["timingsByAddress"]:
+                body = {"code": 200, "status": "OK", "data": _day(datetime.strptime(parts[-1], "%d-%m-%Y").date())}
+            elif parts[-1:] == ["timingsByAddress"]:
+                body = {"code": 200, "status": "OK", "data": _day(date.today())}
+            elif parts[-1:] == ["version.txt"]:
+                return self._send(200, b"0.6\n", "text/plain")
+            else:
+                return self._send(404, b'{"code": 404, "status": "Not Found"}')
+        except ValueError:
+            return self._send(400, b'{"code": 400, "status": "Bad Request"}')
+        self._send(200, json.dumps(body).encode("utf-8"))
+
+    def _send(self, status, payload, ctype="application/json"):
+        self.send_response(status)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+def start(port=0, handler=Handler):
+    """Starts the server on a background thread, returns (server, base_url)."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), Handler)
+    print(f"Serving fake aladhan on http://127.0.0.1:{args.port}/v1")
+    server.serve_forever()
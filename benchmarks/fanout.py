@@ -0,0 +1,85 @@
+"""
+Fan-out benchmark for broadcaster.py.
+
+    python benchmarks/fanout.py --subscribers 2000 --events 50
+
+Connects N subscribers to an in-process broadcaster over a Unix socket,
+publishes events and reports how long each takes to reach every
+subscriber (p50/p99/max), with one stalled subscriber that never reads.
+The subscribers run on the same loop as the broadcaster, so latency
+includes their own parsing; real clients in other processes see less.
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import broadcaster
+
+async def run(n_subs, n_events, interval):
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < 2 * n_subs + 64:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (min(hard, 2 * n_subs + 64), hard))
+    path = os.path.join(tempfile.mkdtemp(), "events.sock")
+    hub = broadcaster.Hub()
+    server = await asyncio.start_unix_server(hub.handle, path, limit=4096, backlog=n_subs)
+
+    latencies = []
+    done = asyncio.Event()
+    remaining = [n_subs * n_events]
+
+    async def subscriber():
+        reader, writer = await asyncio.open_unix_connection(path)
+        for _ in range(n_events):
+            event = json.loads(await reader.readline())
+            latencies.append(time.perf_counter() - event["sent"])
+            remaining[0] -= 1
+            if not remaining[0]: done.set()
+        writer.close()
+
+    # Connects but never reads: once its socket buffer fills it loses old events, nobody else slows down
+    stalled = await asyncio.open_unix_connection(path)
+    tasks = [asyncio.create_task(subscriber()) for _ in range(n_subs)]
+    while len(hub.subscribers) < n_subs + 1:
+        await asyncio.sleep(0.01)
+
+    start = time.perf_counter()
+    for i in range(n_events):
+        hub.publish({"event": "remaining", "prayer": "Asr", "at": "15:00", "minutes": i, "sent": time.perf_counter(),
+                     "pad": "x" * 200})
+        await asyncio.sleep(interval)
+    await asyncio.wait_for(done.wait(), 60)
+    elapsed = time.perf_counter() - start
+    await asyncio.gather(*tasks)
+    stalled[1].close()
+    # Let every handler see its client go before the loop shuts down
+    while hub.subscribers:
+        await asyncio.sleep(0.01)
+    server.close()
+
+    latencies.sort()
+    ms = lambda q: round(latencies[min(len(latencies) - 1, int(len(latencies) * q))] * 1000, 2)
+    return {"subscribers": n_subs, "events": n_events, "deliveries": len(latencies),
+            "deliveries_per_sec": round(len(latencies) / elapsed), "p50_ms": ms(0.5), "p99_ms": ms(0.99),
+            "max_ms": round(latencies[-1] * 1000, 2), "mean_ms": round(statistics.mean(latencies) * 1000, 2)}
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--subscribers", type=int, default=1000)
+    parser.add_argument("--events", type=int, default=20)
+    parser.add_argument("--interval", type=float, default=0.05, help="seconds between published events")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.subscribers, args.events, args.interval)), indent=2))
+    import metrics
+    print(json.dumps(metrics.snapshot()["counters"], indent=2))
+
+if __name__ == "__main__":
+    main()
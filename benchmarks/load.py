@@ -0,0 +1,107 @@
+"""
+Load driver for the client code, run against benchmarks/standin.py.
+
+    python benchmarks/load.py --target daily --concurrency 32 --duration 10 \\
+        --latency-ms 50 --error-rate 0.01
+
+Starts an in-process stand-in (or uses --api-base for one that is already
+running), hammers one client path from N threads and reports throughput,
+latency percentiles and error counts. Every call uses a fresh address so
+the timings cache and request coalescing don't hide the network path.
+"""
+import argparse
+import itertools
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import date
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+TARGETS = ("daily", "monthly", "version")
+
+def make_call(target, api):
+    counter = itertools.count()
+    today = date.today()
+    if target == "daily":
+        return lambda: api.fetch_prayer_times(f"Load Town {next(counter)}") is not None
+    if target == "monthly":
+        return lambda: api.fetch_month(f"Load Town {next(counter)}", today.year, today.month) is not None
+    # check_version_mismatch returns None both for "same version" and errors,
+    # so ask for a version the stand-in never reports
+    return lambda: api.check_version_mismatch("load-test") is not None
+
+def drive(call, concurrency, duration):
+    samples, errors = [], [0]
+    lock = threading.Lock()
+    stop = time.monotonic() + duration
+
+    def worker():
+        local, failed = [], 0
+        while time.monotonic() < stop:
+            t0 = time.perf_counter()
+            try:
+                ok = call()
+            except Exception:
+                ok = False
+            local.append(time.perf_counter() - t0)
+            failed += not ok
+        with lock:
+            samples.extend(local); errors[0] += failed
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    start = time.monotonic()
+    for t in threads: t.start()
+    for t in threads: t.join()
+    elapsed = time.monotonic() - start
+
+    samples.sort()
+    pick = lambda q: round(samples[min(len(samples) - 1, int(len(samples) * q))] * 1000, 2) if samples else None
+    return {"requests": len(samples), "errors": errors[0], "seconds": round(elapsed, 2),
+            "throughput_rps": round(len(samples) / elapsed, 1),
+            "p50_ms": pick(0.5), "p95_ms": pick(0.95), "p99_ms": pick(0.99), "max_ms": pick(1.0)}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", choices=TARGETS, default="daily")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--api-base", default=None, help="use a running stand-in instead of starting one")
+    parser.add_argument("--replay", metavar="DIR", default=None)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rps", type=float, default=0)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    os.environ["PRAYER_CACHE_DB"] = os.path.join(tempfile.mkdtemp(), "timings.db")
+    server = None
+    if args.api_base:
+        base, version_url = args.api_base, args.api_base.rsplit("/v1", 1)[0] + "/version.txt"
+    else:
+        import standin
+        faults = standin.Faults(args.latency_ms, args.jitter_ms, args.error_rate, args.throttle_rps)
+        server, base, version_url = standin.start(args.replay, "replay", faults)
+
+    import api
+    import http_client
+    api.API_BASE, api.VERSION_URL = base, version_url
+    http_client.POOL_SIZE = max(http_client.POOL_SIZE, args.concurrency)
+
+    report = drive(make_call(args.target, api), args.concurrency, args.duration)
+    report.update(target=args.target, concurrency=args.concurrency)
+    if server: server.shutdown()
+
+    if args.json:
+        print(json.dumps(report))
+    else:
+        for k, v in report.items(): print(f"{k:<16}{v}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Record/replay stand-in for api.aladhan.com with fault injection.
+
+    # record real responses while using the app normally
+    python benchmarks/standin.py --record recordings/
+    # replay them, with 80 +/- 40 ms latency, 2% errors and a 50 req/s limit
+    python benchmarks/standin.py --replay recordings/ --latency-ms 80 --jitter-ms 40 \\
+        --error-rate 0.02 --throttle-rps 50
+
+Point the app at it with ALADHAN_API=http://127.0.0.1:8765/v1 (and
+PRAYER_VERSION_URL=http://127.0.0.1:8765/version.txt for version checks).
+Requests that have no recording fall back to the synthetic responses of
+fake_aladhan.py unless --strict is given.
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from urllib.parse import urlparse, parse_qsl, urlencode
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import fake_aladhan
+
+UPSTREAM = "http://api.aladhan.com"
+VERSION_UPSTREAM = "https://raw.githubusercontent.com/MH7Q/prayer-time-cli/refs/heads/main"
+
+class Faults:
+    def __init__(self, latency_ms=0, jitter_ms=0, error_rate=0.0, throttle_rps=0):
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.error_rate = error_rate
+        self.rate = throttle_rps
+        self._tokens = float(throttle_rps)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def delay(self):
+        d = self.latency + random.uniform(-self.jitter, self.jitter)
+        if d > 0: time.sleep(d)
+
+    def throttled(self):
+        # Token bucket refilled at `rate` per second, burst of one second's worth
+        if not self.rate:
+            return False
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.rate, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            if self._tokens < 1:
+                return True
+            self._tokens -= 1
+            return False
+
+    def failed(self):
+        return random.random() < self.error_rate
+
+def _key(path):
+    u = urlparse(path)
+    canonical = u.path + "?" + urlencode(sorted(parse_qsl(u.query)))
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+
+def make_handler(store, mode, faults, strict=False):
+    class Handler(fake_aladhan.Handler):
+        def do_GET(self):
+            faults.delay()
+            if faults.throttled():
+                return self._send_extra(429, b'{"code": 429, "status": "Too Many Requests"}', {"Retry-After": "1"})
+            if faults.failed():
+                return self._send(503, b'{"code": 503, "status": "Service Unavailable"}')
+
+            path = os.path.join(store, _key(self.path) + ".json") if store else None
+            if mode == "record":
+                return self._record(path)
+            if path and os.path.exists(path):
+                with open(path, encoding="utf-8") as f:
+                    rec = json.load(f)
+                return self._send(rec["status"], rec["body"].encode("utf-8"), rec.get("content_type", "application/json"))
+            if strict:
+                return self._send(404, b'{"code": 404, "status": "No recording"}')
+            super().do_GET()
+
+        def _record(self, path):
+            base = VERSION_UPSTREAM if self.path.endswith("version.txt") else UPSTREAM
+            upstream = base + ("/version.txt" if base == VERSION_UPSTREAM else self.path)
+            try:
+                with urllib.request.urlopen(upstream, timeout=15) as res:
+                    status, body, ctype = res.status, res.read(), res.headers.get("Content-Type", "application/json")
+            except urllib.error.HTTPError as e:
+                status, body, ctype = e.code, e.read(), e.headers.get("Content-Type", "application/json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"path": self.path, "status": status, "content_type": ctype,
+                           "body": body.decode("utf-8")}, f, ensure_ascii=False)
+            self._send(status, body, ctype)
+
+        def _send_extra(self, status, payload, headers):
+            self.send_response(status)
+            for k, v in headers.items(): self.send_header(k, v)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+    return Handler
+
+def start(store=None, mode="replay", faults=None, strict=False, port=0):
+    """Starts the stand-in on a background thread, returns (server, api_base, version_url)."""
+    handler = make_handler(store, mode, faults or Faults(), strict)
+    server, base = fake_aladhan.start(port, handler)
+    return server, base, base[:-len("/v1")] + "/version.txt"
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--record", metavar="DIR")
+    group.add_argument("--replay", metavar="DIR")
+    parser.add_argument("--strict", action="store_true", help="404 instead of synthesizing unrecorded requests")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rps", type=float, default=0)
+    args = parser.parse_args()
+
+    store = args.record or args.replay
+    if store: os.makedirs(store, exist_ok=True)
+    faults = Faults(args.latency_ms, args.jitter_ms, args.error_rate, args.throttle_rps)
+    server, base, version_url = start(store, "record" if args.record else "replay", faults, args.strict, args.port)
+    print(f"ALADHAN_API={base}\nPRAYER_VERSION_URL={version_url}")
+    try:
+        while True: time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
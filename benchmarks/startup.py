@@ -0,0 +1,115 @@
+"""
+Startup benchmark for the CLI and the tray app.
+
+    python benchmarks/startup.py                 # CLI only
+    python benchmarks/startup.py --gui           # also time the Tk first paint
+    python benchmarks/startup.py --budget-ms 100 # exit 1 when the CLI is slower
+    python benchmarks/startup.py --gui --gui-budget-ms 300
+
+Reports the slowest imports (from `python -X importtime`) and the wall time
+from process spawn to the first line of output / first painted frame.
+The tray app paints from the saved schedule, so its first paint is timed
+with a schedule file in place (the normal case after the first run).
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GUI_BUDGET_MS = 300  # time-to-first-paint target for the tray app
+
+def import_breakdown(module, top=10):
+    """Cumulative import time per module in ms, slowest first."""
+    res = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                         cwd=ROOT, capture_output=True, text=True)
+    rows = []
+    for line in res.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cum_us, name = [p.strip() for p in line[len("import time:"):].split("|")]
+        rows.append((int(cum_us) / 1000, int(self_us) / 1000, name))
+    rows.sort(reverse=True)
+    return rows[:top]
+
+def time_to_first_line(cmd, runs, env=None, cwd=None, expect=None):
+    """
+    Spawns `cmd` `runs` times, returns the wall times (ms) until its first
+    stdout line, or None if that line isn't `expect` (e.g. the app crashed).
+    """
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                stdin=subprocess.DEVNULL, env=env, cwd=cwd, text=True)
+        line = proc.stdout.readline()
+        samples.append((time.perf_counter() - start) * 1000)
+        proc.stdout.read()
+        proc.wait()
+        if expect is not None and line.strip() != expect:
+            return None
+    return samples
+
+def summary(samples):
+    samples = sorted(samples)
+    return {
+        "min": round(samples[0], 1),
+        "median": round(statistics.median(samples), 1),
+        "p90": round(samples[min(len(samples) - 1, int(len(samples) * 0.9))], 1),
+    }
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--gui", action="store_true")
+    parser.add_argument("--budget-ms", type=float, default=None)
+    parser.add_argument("--gui-budget-ms", type=float, default=GUI_BUDGET_MS)
+    args = parser.parse_args()
+
+    print("Slowest imports for prayer_times_cli (cumulative / self, ms):")
+    for cum, own, name in import_breakdown("prayer_times_cli"):
+        print(f"  {cum:8.1f} {own:8.1f}  {name}")
+
+    # Run in a scratch directory so the benchmark never touches real settings
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {**os.environ, "PRAYER_CACHE_DB": os.path.join(tmp, "timings.db"),
+               "PRAYER_CONFIG": os.path.join(tmp, "config.json"),
+               "PRAYER_SCHEDULE_FILE": os.path.join(tmp, "schedule.json")}
+        cli = [sys.executable, os.path.join(ROOT, "prayer_times_cli.py"), "-a", "Riyadh, SA", "-l", "en"]
+        baseline = summary(time_to_first_line([sys.executable, "-c", "print()"], args.runs, env, tmp))
+        cli_times = summary(time_to_first_line(cli, args.runs, env, tmp))
+    print(f"\nBare interpreter      {baseline}")
+    print(f"CLI first output (ms) {cli_times}")
+
+    gui_times = None
+    if args.gui:
+        with tempfile.TemporaryDirectory() as tmp:
+            env = {**os.environ, "PRAYER_CACHE_DB": os.path.join(tmp, "timings.db"),
+                   "PRAYER_CONFIG": os.path.join(tmp, "config.json"),
+                   "PRAYER_SCHEDULE_FILE": os.path.join(tmp, "schedule.json")}
+            sys.path.insert(0, ROOT)
+            os.environ["PRAYER_SCHEDULE_FILE"] = env["PRAYER_SCHEDULE_FILE"]
+            import status
+            # A schedule left by an earlier run; contents don't matter for paint time
+            today = date.today()
+            status.save("Riyadh", [(today + timedelta(days=i), {"Fajr": "04:30", "Sunrise": "05:50", "Dhuhr": "11:45",
+                                                                  "Asr": "15:10", "Maghrib": "17:40", "Isha": "19:10"})
+                                   for i in (-1, 0, 1, 2)])
+            gui = [sys.executable, os.path.join(ROOT, "main.py"), "--startup-probe"]
+            samples = time_to_first_line(gui, max(3, args.runs // 4), env, ROOT, expect="painted")
+        gui_times = summary(samples) if samples else None
+        print(f"GUI first paint (ms)  {gui_times or 'unavailable (no display?)'}")
+
+    if args.budget_ms is not None and cli_times["median"] > args.budget_ms:
+        print(f"\nFAIL: CLI median {cli_times['median']} ms is over the {args.budget_ms} ms budget")
+        sys.exit(1)
+    if gui_times and gui_times["median"] > args.gui_budget_ms:
+        print(f"\nFAIL: GUI first paint median {gui_times['median']} ms is over the {args.gui_budget_ms} ms budget")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+import bisect
+import mmap
+import os
+import struct
+from collections import namedtuple
+from datetime import date, timedelta
+import gazetteer
+
+# --- Binary schedule store ---
+# A fixed-width file of prayer times as minutes since local midnight, one
+# uint16 per prayer per day, for many locations over the same date range:
+#
+#   header     magic, version, prayers per day, locations, first day, days
+#   locations  one 128-byte record each, sorted by normalized city name
+#   minutes    locations x days x prayers, little-endian uint16
+#
+# The file is memory-mapped, so opening a year for thousands of places
+# copies nothing, and a day's lookup is a single struct.unpack_from at a
+# computed offset. Missing times (polar days, gaps in a download) are MISSING.
+#
+# Stores are built and queried with `python binstore.py` for bulk use (many
+# places, long ranges); the CLI and tray app keep the JSON cache and only
+# share to_minutes() for reading "HH:MM (+03)" strings.
+
+MAGIC = b"PTSB"
+VERSION = 1
+PRAYERS = ('Fajr', 'Sunrise', 'Dhuhr', 'Asr', 'Maghrib', 'Isha')
+MISSING = 0xFFFF
+
+_HEADER = struct.Struct("<4sHHIIH14x")           # 32 bytes
+_LOCATION = struct.Struct("<40s40s32sffB7x")     # 128 bytes: key, name, tz, lat, lon, method
+_DAY = struct.Struct("<" + "H" * len(PRAYERS))
+
+Location = namedtuple("Location", "name tz lat lon method")
+
+def to_minutes(value):
+    """'05:12 (+03)' or '05:12' -> 312. Anything unparsable is MISSING."""
+    try:
+        h, m = int(value[:2]), int(value[3:5])
+        return h * 60 + m if value[2] == ":" and h < 24 and m < 60 else MISSING
+    except (ValueError, IndexError, TypeError):
+        return MISSING
+
+def to_hhmm(minutes):
+    return None if minutes == MISSING else f"{minutes // 60:02}:{minutes % 60:02}"
+
+def _pack(text, size):
+    raw = text.encode("utf-8")[:size]
+    # Don't leave half a multi-byte character at the cut
+    return raw.decode("utf-8", "ignore").encode("utf-8")
+
+def _unpack(raw):
+    return raw.rstrip(b"\0").decode("utf-8")
+
+# --- Writing ---
+def write(path, start, n_days, entries):
+    """
+    `entries` is an iterable of (Location, {date: timings}) where timings are
+    aladhan-style "HH:MM" strings. Days outside [start, start + n_days) are
+    ignored, days without data are stored as MISSING. Returns the location count.
+    """
+    rows = []
+    for loc, days in entries:
+        block = bytearray(_DAY.pack(*[MISSING] * len(PRAYERS)) * n_days)
+        for day, timings in days.items():
+            i = (day - start).days
+            if 0 <= i < n_days:
+                _DAY.pack_into(block, i * _DAY.size, *(to_minutes(timings.get(p, "")) for p in PRAYERS))
+        rows.append((gazetteer.normalize(loc.name.split(",")[0]), loc, block))
+    # Sorted by the truncated key actually stored, which is what find() bisects
+    rows.sort(key=lambda r: _pack(r[0], 40))
+
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, len(PRAYERS), len(rows), start.toordinal(), n_days))
+        for key, loc, _ in rows:
+            f.write(_LOCATION.pack(_pack(key, 40), _pack(loc.name, 40), _pack(loc.tz or "", 32),
+                                   loc.lat, loc.lon, loc.method))
+        for _, _, block in rows:
+            f.write(block)
+    os.replace(tmp, path)
+    return len(rows)
+
+def from_responses(name, responses):
+    """
+    Converts saved aladhan responses for one place into (Location, {date: timings}).
+    Accepts whole responses ({"data": ...}) or bare day objects, calendar or single day.
+    """
+    days, meta = {}, {}
+    for res in responses:
+        data = res.get("data", res) if isinstance(res, dict) else res
+        for d in data if isinstance(data, list) else [data]:
+            g = d['date']['gregorian']['date']  # DD-MM-YYYY
+            days[date(int(g[6:10]), int(g[3:5]), int(g[:2]))] = d['timings']
+            meta = d.get('meta', meta)
+    loc = Location(name, meta.get('timezone', ""), float(meta.get('latitude', 0)),
+                   float(meta.get('longitude', 0)), int(meta.get('method', {}).get('id', 0)))
+    return loc, days
+
+def from_engine(places, start, n_days, method=None):
+    """Yields (Location, {date: timings}) computed by the offline engine for gazetteer places."""
+    import astro
+    method = astro.DEFAULT_METHOD if method is None else method
+    dates = [start + timedelta(days=i) for i in range(n_days)]
+    for p in places:
+        # compute_days applies the Umm al-Qura Ramadan Isha the same way a live fetch does
+        data = astro.compute_days(p.lat, p.lon, dates, p.tz, [method])[method]
+        days = {d: {k: data[i]['timings'][k][:5] for k in PRAYERS} for i, d in enumerate(dates)}
+        yield Location(gazetteer.display(p), p.tz, p.lat, p.lon, method), days
+
+# --- Reading ---
+class Store:
+    """Read-only view over a store file. Locations are addressed by index, see find()."""
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, n_prayers, self.count, first, self.days = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION or n_prayers != len(PRAYERS):
+            raise ValueError(f"{path}: not a version {VERSION} schedule store")
+        self.start = date.fromordinal(first)
+        self._data = _HEADER.size + self.count * _LOCATION.size
+        self._stride = self.days * _DAY.size
+        # Lets bisect search the on-disk keys without reading them all
+        self._keys = _Keys(self)
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        self._mm.close()
+
+    def location(self, i):
+        key, name, tz, lat, lon, method = _LOCATION.unpack_from(self._mm, _HEADER.size + i * _LOCATION.size)
+        return Location(_unpack(name), _unpack(tz), lat, lon, method)
+
+    def find(self, address):
+        """
+        Indices of locations matching an address the way gazetteer.resolve()
+        reads it: the city name, narrowed by country when one is named. A
+        part that isn't a country matches nothing.
+        """
+        parts = [gazetteer.normalize(p) for p in address.split(",") if p.strip()]
+        if not parts:
+            return []
+        key = _pack(parts[0], 40)
+        i = bisect.bisect_left(self._keys, key)
+        out = []
+        while i < self.count and self._keys[i] == key:
+            out.append(i); i += 1
+        codes = gazetteer.countries()
+        if any(p not in codes for p in parts[1:]):
+            return []
+        wanted = {codes[p] for p in parts[1:]}
+        if wanted:
+            out = [i for i in out if codes.get(gazetteer.normalize(self.location(i).name.rpartition(",")[2])) in wanted]
+        return out
+
+    def minutes(self, i, day):
+        """Tuple of minutes since midnight in PRAYERS order, or None outside the stored range."""
+        n = (day - self.start).days
+        if not 0 <= n < self.days or not 0 <= i < self.count:
+            return None
+        return _DAY.unpack_from(self._mm, self._data + i * self._stride + n * _DAY.size)
+
+    def timings(self, i, day):
+        """Same as minutes() as an aladhan-style {"Fajr": "HH:MM", ...} dict."""
+        m = self.minutes(i, day)
+        return None if m is None else {p: to_hhmm(v) for p, v in zip(PRAYERS, m) if v != MISSING}
+
+class _Keys:
+    def __init__(self, store):
+        self.store = store
+
+    def __len__(self):
+        return self.store.count
+
+    def __getitem__(self, i):
+        return _LOCATION.unpack_from(self.store._mm, _HEADER.size + i * _LOCATION.size)[0].rstrip(b"\0")
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    parser = argparse.ArgumentParser(description="Build or query a binary schedule store")
+    parser.add_argument("store")
+    parser.add_argument("query", nargs="?", help="place name to look up")
+    parser.add_argument("--day", default=None, help="YYYY-MM-DD, defaults to today")
+    parser.add_argument("--convert", nargs="+", metavar="NAME=FILE",
+                        help="build from saved aladhan JSON responses, one or more files per place")
+    parser.add_argument("--offline", type=int, metavar="YEAR", help="build a year for every gazetteer place")
+    args = parser.parse_args()
+
+    if args.convert:
+        grouped = {}
+        for spec in args.convert:
+            name, _, path = spec.rpartition("=")
+            name = name or os.path.splitext(os.path.basename(path))[0].replace("_", " ")
+            with open(path, encoding="utf-8") as f:
+                grouped.setdefault(name, []).append(json.load(f))
+        entries = [from_responses(n, r) for n, r in grouped.items()]
+        all_days = [d for _, days in entries for d in days]
+        start = min(all_days)
+        n = write(args.store, start, (max(all_days) - start).days + 1, entries)
+        print(f"Wrote {n} locations to {args.store}")
+    elif args.offline:
+        start = date(args.offline, 1, 1)
+        n = write(args.store, start, (date(args.offline + 1, 1, 1) - start).days,
+                  from_engine(gazetteer.places(), start, (date(args.offline + 1, 1, 1) - start).days))
+        print(f"Wrote {n} locations to {args.store}")
+    else:
+        store = Store(args.store)
+        print(f"{len(store)} locations, {store.start} + {store.days} days")
+        if args.query:
+            day = date.fromisoformat(args.day) if args.day else date.today()
+            for i in store.find(args.query):
+                print(store.location(i), store.timings(i, day))
@@ -0,0 +1,221 @@
+import asyncio
+import json
+import os
+import socket
+import sys
+from datetime import timedelta
+import daemon
+import metrics
+import scheduler
+
+# --- Prayer event broadcaster ---
+# One asyncio loop pushes prayer events to every connected subscriber, so
+# wall displays and scripts don't each poll on their own:
+#
+#   $ nc -U "$XDG_RUNTIME_DIR/prayer-time-cli-events.sock"
+#   {"event": "next", "prayer": "Asr", "at": "14:57", "seconds": 5025}
+#   {"event": "remaining", "prayer": "Asr", "at": "14:57", "minutes": 15}
+#   {"event": "started", "prayer": "Asr", "at": "14:57"}
+#
+# On connect a subscriber gets the current "next" snapshot, then every
+# event. It can send a JSON filter line at any time to narrow that down:
+#
+#   {"prayers": ["Fajr", "Maghrib"], "events": ["started"], "minutes": [10]}
+#
+# Each event is encoded once and shared by every subscriber. Subscribers
+# have a bounded queue: when a slow one falls QUEUE_SIZE events behind,
+# its oldest events are dropped, and one that can't take a write for
+# WRITE_TIMEOUT seconds is disconnected, so nobody can stall the loop.
+
+REMINDERS = (30, 15, 5, 1)  # minutes before each prayer
+QUEUE_SIZE = 64
+WRITE_TIMEOUT = 10  # seconds
+EVENTS = ("next", "remaining", "started")
+
+def socket_path():
+    return daemon.runtime_socket("prayer-time-cli-events")
+
+def _encode(event):
+    return (json.dumps(event, ensure_ascii=False) + "\n").encode("utf-8")
+
+class Filter:
+    """Which events a subscriber wants. Empty fields match everything."""
+    def __init__(self, prayers=(), events=(), minutes=()):
+        self.prayers, self.events, self.minutes = set(prayers), set(events), set(minutes)
+
+    @classmethod
+    def parse(cls, line):
+        spec = json.loads(line)
+        if not isinstance(spec, dict):
+            raise ValueError("filter must be a JSON object")
+        fields = {}
+        for key, known in (("prayers", scheduler.PRAYERS), ("events", EVENTS), ("minutes", REMINDERS)):
+            values = spec.get(key) or []
+            if not isinstance(values, list):
+                raise ValueError(f"{key} must be a list")
+            unknown = [v for v in values if isinstance(v, bool) or v not in known]
+            if unknown:
+                raise ValueError(f"unknown {key} {unknown}, expected some of {list(known)}")
+            fields[key] = values
+        return cls(**fields)
+
+    def matches(self, event):
+        return ((not self.prayers or event.get("prayer") in self.prayers)
+                and (not self.events or event["event"] in self.events)
+                and (not self.minutes or event["event"] != "remaining" or event["minutes"] in self.minutes))
+
+    def to_dict(self):
+        return {"prayers": sorted(self.prayers), "events": sorted(self.events), "minutes": sorted(self.minutes)}
+
+class Subscriber:
+    def __init__(self, writer):
+        self.writer = writer
+        self.filter = Filter()
+        self.queue = asyncio.Queue(QUEUE_SIZE)
+        self.dropped = 0
+
+    def push(self, event, line):
+        if not self.filter.matches(event):
+            return
+        if self.queue.full():
+            # Backpressure: a lagging subscriber loses its oldest events, never blocks the others
+            self.queue.get_nowait()
+            self.dropped += 1
+            metrics.inc("broadcast_dropped_total", 1, "Events dropped for subscribers that fell behind")
+        self.queue.put_nowait(line)
+
+class Hub:
+    """The set of subscribers and the fan-out to them."""
+    def __init__(self, snapshot=None):
+        self.subscribers = set()
+        self.snapshot = snapshot  # () -> the "next" event for new subscribers, or None
+
+    def publish(self, event):
+        line = _encode(event)
+        metrics.inc("broadcast_events_total", 1, "Events published by the broadcaster")
+        for sub in list(self.subscribers):
+            sub.push(event, line)
+
+    async def handle(self, reader, writer):
+        sub = Subscriber(writer)
+        self.subscribers.add(sub)
+        metrics.inc("broadcast_connections_total", 1, "Subscribers that connected to the broadcaster")
+        sender = asyncio.create_task(self._send(sub))
+        try:
+            first = self.snapshot() if self.snapshot else None
+            if first:
+                sub.push(first, _encode(first))
+            async for line in reader:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    sub.filter = Filter.parse(line)
+                    reply = {"event": "subscribed", "filter": sub.filter.to_dict()}
+                except ValueError as e:
+                    reply = {"event": "error", "error": f"bad filter: {e}"}
+                # Control replies skip the filter but still go through the queue, in order
+                if not sub.queue.full():
+                    sub.queue.put_nowait(_encode(reply))
+        except (ConnectionError, ValueError):  # ValueError: a line over the reader's limit
+            pass
+        finally:
+            self.subscribers.discard(sub)
+            sender.cancel()
+            writer.close()
+
+    async def _send(self, sub):
+        try:
+            while True:
+                sub.writer.write(await sub.queue.get())
+                await asyncio.wait_for(sub.writer.drain(), WRITE_TIMEOUT)
+        except (asyncio.TimeoutError, ConnectionError):
+            metrics.inc("broadcast_disconnected_total", 1, "Subscribers cut off for not reading")
+            sub.writer.close()
+        except asyncio.CancelledError:
+            pass
+
+# --- Timeline ---
+def upcoming(timeline, now):
+    """[(when, event)] for the reminders and prayer starts after `now`, in time order."""
+    out = []
+    for t, p in timeline:
+        at = t.strftime("%H:%M")
+        for m in REMINDERS:
+            when = t - timedelta(minutes=m)
+            if when > now:
+                out.append((when, {"event": "remaining", "prayer": p, "at": at, "minutes": m}))
+        if t > now:
+            out.append((t, {"event": "started", "prayer": p, "at": at}))
+    out.sort(key=lambda e: e[0])
+    return out
+
+async def _publish_loop(hub, state):
+    loop = asyncio.get_running_loop()
+    cursor = state.sched.now()  # everything due up to here has been published
+    while True:
+        # Anything older than the grace period would be skipped anyway
+        cursor = max(cursor, state.sched.now() - timedelta(seconds=scheduler.MISSED_GRACE))
+        refresh_at = cursor + timedelta(seconds=daemon.seconds_to_refresh(cursor))
+        for when, event in upcoming(state.sched.timeline, cursor):
+            if when >= refresh_at:
+                break
+            # Sleep on the location's clock; re-reading it after each wait keeps drift out
+            delay = (when - state.sched.now()).total_seconds()
+            if delay < -scheduler.MISSED_GRACE:
+                continue  # the machine slept through it
+            if delay > 0:
+                await asyncio.sleep(delay)
+            hub.publish(event)
+        delay = (refresh_at - state.sched.now()).total_seconds()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        # Events that fall due while the refresh runs are picked up next round
+        cursor = refresh_at
+        try:
+            # The fetch blocks, keep it off the loop
+            fresh = daemon.State(state.address)
+            await loop.run_in_executor(None, fresh.load)
+            state = fresh
+            hub.snapshot = lambda: _next_event(state)
+        except Exception:
+            pass  # keep publishing from the last good schedule
+
+def _next_event(state):
+    reply = state.answer("next")
+    if "error" in reply:
+        return None
+    return {"event": "next", "prayer": reply["prayer"], "at": reply["at"], "seconds": reply["seconds"]}
+
+async def _serve(address, path, port):
+    state = daemon.State(address)
+    await asyncio.get_running_loop().run_in_executor(None, state.load)
+    hub = Hub(lambda: _next_event(state))
+    if port:
+        server = await asyncio.start_server(hub.handle, "127.0.0.1", port, limit=4096)
+    else:
+        server = await asyncio.start_unix_server(hub.handle, path, limit=4096)
+        os.chmod(path, 0o600)
+    async with server:
+        await _publish_loop(hub, state)
+
+def serve(address, path=None, port=None):
+    """Runs the broadcaster in the foreground until interrupted. `port` listens on localhost TCP instead."""
+    path = path or socket_path()
+    if not port:
+        daemon.claim_socket(path)
+    daemon.exit_on_sigterm()
+    try:
+        asyncio.run(_serve(address, path, port))
+    finally:
+        if not port and os.path.exists(path): os.unlink(path)
+
+def listen(filter_spec=None, path=None, port=None, out=sys.stdout):
+    """Prints events from a running broadcaster until it goes away."""
+    family, target = (socket.AF_INET, ("127.0.0.1", port)) if port else (socket.AF_UNIX, path or socket_path())
+    with socket.socket(family, socket.SOCK_STREAM) as s:
+        s.connect(target)
+        if filter_spec:
+            s.sendall(json.dumps(filter_spec).encode("utf-8") + b"\n")
+        for line in s.makefile("r", encoding="utf-8"):
+            out.write(line); out.flush()
@@ -0,0 +1,103 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import metrics
+import paths
+
+# --- Persistent timings cache ---
+# One SQLite database shared by the tray app and every CLI run. WAL mode lets
+# readers and a writer work at the same time across processes.
+
+CACHE_TTL = 30 * 24 * 3600  # a given day's timings never change, this only bounds staleness
+MAX_ENTRIES = 5000
+
+_local = threading.local()
+
+def cache_path():
+    return os.getenv("PRAYER_CACHE_DB") or os.path.join(paths.cache_dir(), "timings.db")
+
+def _connect():
+    # sqlite3 connections can't be shared between threads, keep one per thread
+    path = cache_path()
+    conn = getattr(_local, "conn", None)
+    if conn is not None and _local.path == path:
+        return conn
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=5, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("""CREATE TABLE IF NOT EXISTS timings (
+        address TEXT, day TEXT, method INTEGER, data TEXT, stored REAL,
+        PRIMARY KEY (address, day, method))""")
+    conn.execute("CREATE INDEX IF NOT EXISTS timings_stored ON timings (stored)")
+    conn.execute("CREATE TABLE IF NOT EXISTS stats (name TEXT PRIMARY KEY, value INTEGER)")
+    conn.execute("INSERT OR IGNORE INTO stats VALUES ('hits', 0), ('misses', 0)")
+    _local.conn, _local.path = conn, path
+    return conn
+
+def _key(address, day, method):
+    return address.strip().lower(), str(day), int(method)
+
+def get(address, day, method):
+    """Returns the cached `data` object for (address, day, method) or None."""
+    try:
+        conn = _connect()
+        row = conn.execute("SELECT data, stored FROM timings WHERE address=? AND day=? AND method=?",
+                           _key(address, day, method)).fetchone()
+        hit = row is not None and time.time() - row[1] < CACHE_TTL
+        conn.execute("UPDATE stats SET value = value + 1 WHERE name = ?", ("hits" if hit else "misses",))
+        metrics.inc("cache_hits_total" if hit else "cache_misses_total", 1, "Timings cache lookups")
+        return json.loads(row[0]) if hit else None
+    except sqlite3.Error:
+        return None
+
+def has(address, day, method):
+    """Like get() but doesn't decode the entry or count towards the hit rate."""
+    try:
+        row = _connect().execute("SELECT stored FROM timings WHERE address=? AND day=? AND method=?",
+                                 _key(address, day, method)).fetchone()
+        return row is not None and time.time() - row[0] < CACHE_TTL
+    except sqlite3.Error:
+        return False
+
+def put(address, day, method, data):
+    put_many(address, method, [(day, data)])
+
+def put_many(address, method, items):
+    """Stores a batch of (day, data) pairs in one transaction."""
+    now = time.time()
+    rows = [(*_key(address, day, method), json.dumps(data, ensure_ascii=False), now) for day, data in items]
+    try:
+        conn = _connect()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany("INSERT OR REPLACE INTO timings VALUES (?, ?, ?, ?, ?)", rows)
+            _evict(conn)
+    except sqlite3.Error:
+        pass
+
+def _evict(conn):
+    # Drop expired rows, then the oldest ones beyond MAX_ENTRIES
+    conn.execute("DELETE FROM timings WHERE stored < ?", (time.time() - CACHE_TTL,))
+    conn.execute("""DELETE FROM timings WHERE rowid IN (
+        SELECT rowid FROM timings ORDER BY stored DESC LIMIT -1 OFFSET ?)""", (MAX_ENTRIES,))
+
+def stats():
+    conn = _connect()
+    counts = dict(conn.execute("SELECT name, value FROM stats").fetchall())
+    hits, misses = counts.get("hits", 0), counts.get("misses", 0)
+    total = hits + misses
+    return {
+        "path": cache_path(),
+        "entries": conn.execute("SELECT COUNT(*) FROM timings").fetchone()[0],
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / total, 4) if total else 0.0,
+    }
+
+def clear():
+    conn = _connect()
+    conn.execute("DELETE FROM timings")
+    conn.execute("UPDATE stats SET value = 0")
@@ -1,26 +1,146 @@
 import json
 import os
+import threading
+import paths
 
-CONFIG_FILE = "config.json"
+# --- Settings store ---
+# One config file shared by the tray app and the CLI, under the per-user
+# config directory (or PRAYER_CONFIG). The parsed copy is cached and only
+# re-read when the file's mtime/size change, saves are write-and-rename so a
+# reader never sees half a file, and subscribers hear about every change,
+# whether it came from this process or from another one (see poll()).
+
+LEGACY_FILE = "config.json"  # older versions kept it in the working directory
 
 DEFAULT_CONFIG = {
     "lang": "en",
     "city": "Riyadh",
-    "country": "Saudi Arabia"
+    "country": "Saudi Arabia",
+    "time_format": "24h",
 }
 
+_lock = threading.RLock()
+_cache = None       # (stat signature, stored values)
+_listeners = []     # callables(new config, changed keys)
+
+def config_path():
+    return os.getenv("PRAYER_CONFIG") or os.path.join(paths.config_dir(), "config.json")
+
+def _signature(path):
+    try:
+        st = os.stat(path)
+        return st.st_mtime_ns, st.st_size
+    except OSError:
+        return None
+
+def _read(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+def _marker(path):
+    # Left next to the config once the legacy file has been dealt with, so
+    # deleting or resetting the config never brings the old settings back
+    return os.path.join(os.path.dirname(path) or ".", ".legacy-migrated")
+
+def _mark_migrated(path):
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        open(_marker(path), 'a').close()
+    except OSError:
+        pass
+
+def _migrate(path):
+    if os.path.exists(path) or not os.path.exists(LEGACY_FILE) or os.path.exists(_marker(path)):
+        return
+    data = _read(LEGACY_FILE)
+    # The CLI called the location "address", the tray app "city"
+    if "address" in data:
+        data.setdefault("city", data.pop("address"))
+    try:
+        if data:
+            _write(path, data)
+    except OSError:
+        return
+    _mark_migrated(path)
+
+def _write(path, data):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=4)
+    os.replace(tmp, path)
+
+def stored():
+    """Only the values actually saved, without defaults. Cheap to call: one stat() while unchanged."""
+    global _cache
+    path = config_path()
+    with _lock:
+        if _cache is None:
+            _migrate(path)
+        sig = _signature(path)
+        if _cache is None or _cache[0] != sig:
+            _cache = (sig, _read(path) if sig else {})
+        return dict(_cache[1])
+
 def load_config():
-    if os.path.exists(CONFIG_FILE):
-        try:
-            with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                return {**DEFAULT_CONFIG, **json.load(f)}
-        except:
-            pass
-    return DEFAULT_CONFIG
+    return {**DEFAULT_CONFIG, **stored()}
 
 def save_config(data):
-    try:
-        with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=4)
-    except Exception as e:
-        print(f"Error saving config: {e}")
\ No newline at end of file
+    """Replaces the stored values. Writes only when something changed."""
+    global _cache
+    path = config_path()
+    with _lock:
+        old = stored()
+        new = {k: v for k, v in data.items() if v is not None}
+        if new == old:
+            return
+        try:
+            _write(path, new)
+        except OSError as e:
+            print(f"Error saving config: {e}")
+            return
+        _cache = (_signature(path), new)
+    _notify(old, new)
+
+def update(**changes):
+    """Changes some keys, keeping the rest. A None value removes the key."""
+    data = stored()
+    data.update(changes)
+    save_config(data)
+
+def reset():
+    global _cache
+    with _lock:
+        old = stored()
+        path = config_path()
+        try: os.remove(path)
+        except OSError: pass
+        _mark_migrated(path)
+        _cache = (None, {})
+    if old: _notify(old, {})
+
+# --- Change notification ---
+def subscribe(fn):
+    """fn(config, changed_keys) runs after every change, defaults included in `config`."""
+    _listeners.append(fn)
+
+def poll():
+    """Picks up edits made by other processes. Returns True if anything changed."""
+    with _lock:
+        before = dict(_cache[1]) if _cache else None
+        after = stored()
+    if before is None or before == after:
+        return False
+    _notify(before, after)
+    return True
+
+def _notify(old, new):
+    changed = {k for k in set(old) | set(new) if old.get(k) != new.get(k)}
+    cfg = {**DEFAULT_CONFIG, **new}
+    for fn in list(_listeners):
+        try: fn(cfg, changed)
+        except Exception: pass
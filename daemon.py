@@ -0,0 +1,164 @@
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+import tempfile
+import threading
+from datetime import datetime, timedelta
+import api
+import scheduler
+import status
+
+# --- Resident daemon ---
+# Keeps today's and tomorrow's schedule in memory and answers one-line
+# queries over a Unix domain socket, so status bars and prompts don't pay
+# for a Python start and an HTTP request every few seconds:
+#
+#   $ echo next | nc -U "$XDG_RUNTIME_DIR/prayer-time-cli.sock"
+#   {"prayer": "Asr", "at": "14:57", "left": "01:23:45", "seconds": 5025}
+#
+# Commands: next, today, ping. Replies are a single JSON line.
+
+REFRESH_EVERY = 3600  # seconds; also reloads right after midnight
+COMMANDS = ("next", "today", "ping")
+PRAYERS = ['Fajr', 'Sunrise', 'Dhuhr', 'Asr', 'Maghrib', 'Isha']
+
+def runtime_socket(name):
+    """Per-user socket path for `name`, in XDG_RUNTIME_DIR or else the temp dir."""
+    base = os.getenv("XDG_RUNTIME_DIR")
+    if base:
+        return os.path.join(base, f"{name}.sock")
+    uid = os.getuid() if hasattr(os, "getuid") else 0
+    return os.path.join(tempfile.gettempdir(), f"{name}-{uid}.sock")
+
+def socket_path():
+    return runtime_socket("prayer-time-cli")
+
+def claim_socket(path):
+    """
+    Gets `path` ready for a server to bind: raises RuntimeError if another
+    server still answers on it, removes a stale one left by a crashed run.
+    """
+    if os.path.exists(path):
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+                s.connect(path)
+        except OSError:
+            os.unlink(path)
+        else:
+            raise RuntimeError(f"Already running on {path}")
+
+def exit_on_sigterm():
+    # A normal exit runs the server's cleanup, which removes the socket file
+    signal.signal(signal.SIGTERM, lambda *a: sys.exit(0))
+
+class State:
+    """Today's timings and the 48h timeline for one address."""
+    def __init__(self, address):
+        self.address = address
+        self.day = None
+        self.timings = {}
+        self.sched = scheduler.Scheduler(lambda *a: None)
+
+    def load(self, today=None):
+        data = api.fetch_day(self.address, today) if today else api.fetch_today(self.address)
+        if data is None:
+            raise LookupError(f"Location not found: {self.address}")
+        # Answers use the location's clock, wherever the daemon runs
+        self.sched.tz = data['meta'].get('timezone')
+        today = today or self.sched.now().date()
+        tomorrow = today + timedelta(days=1)
+        data_tmr = api.fetch_day(self.address, tomorrow) or data
+        days = [(today, data['timings']), (tomorrow, data_tmr['timings'])]
+        self.sched.load(days)
+        status.save(self.address, days, self.sched.tz)
+        self.day, self.timings = today, {p: data['timings'][p][:5] for p in PRAYERS}
+
+    def answer(self, cmd, now=None):
+        now = now or self.sched.now()
+        if cmd == "ping":
+            return {"ok": True, "address": self.address}
+        if cmd == "today":
+            return {"address": self.address, "date": self.day.isoformat(), "timings": self.timings}
+        if cmd == "next":
+            prayer, at = self.sched.next_prayer(now)
+            if not prayer:
+                return {"error": "no schedule"}
+            secs = int((at - now).total_seconds())
+            return {"address": self.address, "prayer": prayer, "at": at.strftime("%H:%M"),
+                    "left": f"{secs // 3600:02}:{secs % 3600 // 60:02}:{secs % 60:02}", "seconds": secs}
+        return {"error": f"unknown command, expected one of: {', '.join(COMMANDS)}"}
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            cmd = line.decode("utf-8", "replace").strip().lower()
+            if not cmd: continue
+            with self.server.lock:
+                reply = self.server.state.answer(cmd)
+            self.wfile.write((json.dumps(reply, ensure_ascii=False) + "\n").encode("utf-8"))
+
+def _refresh_loop(server, stop):
+    while not stop.wait(seconds_to_refresh(server.state.sched.now())):
+        try:
+            state = State(server.state.address); state.load()
+            with server.lock: server.state = state
+        except Exception:
+            pass  # keep serving the last good schedule
+
+def seconds_to_refresh(now=None):
+    """Seconds until the next reload: REFRESH_EVERY, or just after midnight if sooner."""
+    now = now or datetime.now()
+    midnight = datetime(now.year, now.month, now.day) + timedelta(days=1, seconds=5)
+    return min(REFRESH_EVERY, (midnight - now).total_seconds())
+
+def serve(address, path=None):
+    """Runs the daemon in the foreground until interrupted."""
+    path = path or socket_path()
+    claim_socket(path)
+    state = State(address); state.load()
+    server = socketserver.ThreadingUnixStreamServer(path, _Handler)
+    server.daemon_threads = True
+    server.state, server.lock = state, threading.Lock()
+    os.chmod(path, 0o600)
+    exit_on_sigterm()
+    stop = threading.Event()
+    threading.Thread(target=_refresh_loop, args=(server, stop), daemon=True).start()
+    try:
+        server.serve_forever()
+    finally:
+        stop.set()
+        server.server_close()
+        if os.path.exists(path): os.unlink(path)
+
+def query(cmd, path=None, timeout=0.5):
+    """Asks a running daemon. Returns the decoded reply, or None if none is reachable."""
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+            s.settimeout(timeout)
+            s.connect(path or socket_path())
+            s.sendall(cmd.encode("utf-8") + b"\n")
+            buf = b""
+            while not buf.endswith(b"\n"):
+                chunk = s.recv(4096)
+                if not chunk: break
+                buf += chunk
+        return json.loads(buf) if buf else None
+    except (OSError, ValueError):
+        return None
+
+def ask(cmd, address):
+    """
+    Thin client: the daemon's answer, or the same answer computed directly
+    if it is down or serving another address. Raises LookupError for an
+    unknown address and the fetch's own errors when offline.
+    """
+    reply = query(cmd)
+    if reply is not None and str(reply.get("address", "")).strip().lower() == address.strip().lower():
+        return reply
+    state = State(address); state.load()
+    return state.answer(cmd)
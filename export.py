@@ -0,0 +1,127 @@
+import csv
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+import api
+import astro
+import geo
+import hijri
+
+# --- Multi-month schedule export ---
+# Months are fetched a few at a time in parallel but written strictly in
+# order, one day at a time, so only the current window of months is ever
+# held in memory.
+
+PRAYERS = ['Fajr', 'Sunrise', 'Dhuhr', 'Asr', 'Maghrib', 'Isha']
+FORMATS = ('csv', 'jsonl', 'ics')
+
+def parse_range(spec):
+    """ "2026-01..2027-12" (or a single "2026-05") -> list of (year, month)."""
+    m = re.fullmatch(r"(\d{4})-(\d{1,2})(?:\.\.(\d{4})-(\d{1,2}))?", spec.strip())
+    if not m:
+        raise ValueError(f"Bad range '{spec}', expected YYYY-MM..YYYY-MM")
+    y1, m1 = int(m.group(1)), int(m.group(2))
+    y2, m2 = (int(m.group(3)), int(m.group(4))) if m.group(3) else (y1, m1)
+    if not (1 <= m1 <= 12 and 1 <= m2 <= 12) or (y2, m2) < (y1, m1):
+        raise ValueError(f"Bad range '{spec}'")
+    return [(y, mo) for y in range(y1, y2 + 1) for mo in range(1, 13) if (y1, m1) <= (y, mo) <= (y2, m2)]
+
+def iter_days(address, months, method=astro.DEFAULT_METHOD, workers=4):
+    """Yields each day's `data` object in date order across `months`."""
+    def load(ym):
+        days = api.fetch_month(address, ym[0], ym[1], method)
+        if days is None:
+            raise LookupError(f"Location not found: {address}")
+        return days
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        window = []
+        todo = iter(months)
+        for ym in todo:
+            window.append(pool.submit(load, ym))
+            if len(window) >= workers:
+                break
+        while window:
+            days = window.pop(0).result()
+            nxt = next(todo, None)
+            if nxt: window.append(pool.submit(load, nxt))
+            yield from days
+
+def _date_of(data):
+    return datetime.strptime(data['date']['gregorian']['date'], "%d-%m-%Y").date()
+
+def _hijri_of(data, day):
+    """Hijri date as YYYY-MM-DD: the local Umm al-Qura table, else whatever the response carried."""
+    h = hijri.to_hijri(day)
+    if h:
+        return f"{h[0]}-{h[1]:02}-{h[2]:02}"
+    d = data['date'].get('hijri')
+    return f"{d['year']}-{d['month']['number']:02}-{int(d['day']):02}" if d else ""
+
+class CsvExporter:
+    def __init__(self, out, address):
+        self.w = csv.writer(out)
+        self.w.writerow(['date', 'hijri'] + PRAYERS)
+    def write(self, data):
+        day = _date_of(data)
+        self.w.writerow([day.isoformat(), _hijri_of(data, day)] + [data['timings'][p][:5] for p in PRAYERS])
+    def close(self): pass
+
+class JsonlExporter:
+    def __init__(self, out, address):
+        self.out, self.address = out, address
+    def write(self, data):
+        day = _date_of(data)
+        row = {'address': self.address, 'date': day.isoformat(), 'hijri': _hijri_of(data, day),
+               'timings': {p: data['timings'][p][:5] for p in PRAYERS}}
+        self.out.write(json.dumps(row, ensure_ascii=False) + "\n")
+    def close(self): pass
+
+class IcsExporter:
+    """One VEVENT per prayer. Times are written in UTC so calendars show them correctly anywhere."""
+    def __init__(self, out, address):
+        self.out, self.address = out, address
+        self.stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        self._line("BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//MH7Q//Prayer Time CLI//EN",
+                   f"X-WR-CALNAME:{self._escape(f'Prayer Times - {address}')}")
+    def _line(self, *lines):
+        for line in lines: self.out.write(line + "\r\n")
+    @staticmethod
+    def _escape(text):
+        return text.replace("\\", "\\\\").replace(",", "\\,").replace(";", "\\;")
+    def write(self, data):
+        day = _date_of(data)
+        try:
+            zone = geo.zone(data['meta'].get('timezone') or "")
+        except ValueError:
+            zone = None  # unknown zone: floating local time
+        uid_base = re.sub(r"[^a-z0-9]+", "-", self.address.lower())
+        for p in PRAYERS:
+            m = re.match(r"(\d\d):(\d\d)", data['timings'].get(p, ""))
+            if not m:
+                continue  # "--:--" where the sun never gets there
+            start = datetime(day.year, day.month, day.day, int(m[1]), int(m[2]))
+            if zone:
+                start = start.replace(tzinfo=zone).astimezone(timezone.utc)
+            self._line("BEGIN:VEVENT",
+                       f"UID:{day:%Y%m%d}-{p.lower()}-{uid_base}@prayer-time-cli",
+                       f"DTSTAMP:{self.stamp}",
+                       f"DTSTART:{start:%Y%m%dT%H%M%S}{'Z' if zone else ''}",
+                       "DURATION:PT15M",
+                       f"SUMMARY:{p}",
+                       "END:VEVENT")
+    def close(self):
+        self._line("END:VCALENDAR")
+
+EXPORTERS = {'csv': CsvExporter, 'jsonl': JsonlExporter, 'ics': IcsExporter}
+
+def export_range(address, spec, out, fmt='csv', method=astro.DEFAULT_METHOD, workers=4):
+    """Streams every day in `spec` to `out`. Returns the number of days written."""
+    exporter = EXPORTERS[fmt](out, address)
+    count = 0
+    for data in iter_days(address, parse_range(spec), method, workers):
+        exporter.write(data)
+        count += 1
+    exporter.close()
+    return count
@@ -0,0 +1,73 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import metrics
+
+# --- Single-flight background fetches ---
+# The tray app asks for timings from several places (startup, settings,
+# the hourly refresh, the midnight rollover). All of them go through one
+# worker thread:
+#
+#   - asking for the key that is already being fetched joins that fetch
+#   - asking for a different key supersedes everything before it: jobs
+#     that haven't started are cancelled, a running one finishes (an HTTP
+#     request can't be interrupted) but its result is thrown away
+#
+# Finished results land in one queue that the UI thread drains, so nothing
+# but the UI thread ever touches Tk.
+
+class Fetcher:
+    def __init__(self, load):
+        """`load(key)` runs on the worker and returns the result, or None on failure."""
+        self._load = load
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="fetch")
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._pending = {}  # key -> future, current generation only
+        self.results = queue.Queue()  # (key, result)
+
+    def request(self, key):
+        """Schedules a fetch of `key` unless one is already running or queued. Returns its future."""
+        with self._lock:
+            fut = self._pending.get(key)
+            if fut is not None:
+                metrics.inc("fetch_merged_total", 1, "Fetches that joined one already in flight")
+                return fut
+            self._generation += 1
+            for old in self._pending.values():
+                if old.cancel():
+                    metrics.inc("fetch_cancelled_total", 1, "Queued fetches dropped before they started")
+            fut = self._pool.submit(self._run, key, self._generation)
+            self._pending = {key: fut}
+            return fut
+
+    def _run(self, key, generation):
+        if generation != self._generation:
+            return None
+        try:
+            result = self._load(key)
+        except Exception:
+            result = None
+        with self._lock:
+            if generation != self._generation:
+                metrics.inc("fetch_discarded_total", 1, "Fetch results dropped because a newer request replaced them")
+                return None
+            self._pending.pop(key, None)
+        self.results.put((key, result))
+        return result
+
+    def busy(self):
+        """True while a fetch is queued or running, or a result is waiting to be drained."""
+        with self._lock:
+            return bool(self._pending) or not self.results.empty()
+
+    def drain(self):
+        """Yields the (key, result) pairs that are ready, without blocking."""
+        while True:
+            try:
+                yield self.results.get_nowait()
+            except queue.Empty:
+                return
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
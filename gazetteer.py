@@ -0,0 +1,243 @@
+import mmap
+import os
+import sys
+import unicodedata
+from collections import namedtuple
+
+# --- Offline city index ---
+# data/cities.idx is a plain text file with one place per line, sorted by a
+# normalized search key:  key \t name \t country code \t lat \t lon \t timezone
+# It is memory-mapped and searched with a byte-level binary search, so a
+# lookup touches a handful of pages no matter how large the index grows.
+
+DATA_DIR = os.path.join(getattr(sys, "_MEIPASS", os.path.dirname(os.path.abspath(__file__))), "data")
+INDEX_FILE = os.path.join(DATA_DIR, "cities.idx")
+COUNTRIES_FILE = os.path.join(DATA_DIR, "countries.tsv")
+EXTRA_FILE = os.path.join(DATA_DIR, "cities_extra.tsv")
+
+Place = namedtuple("Place", "name country lat lon tz")
+
+_mm = None
+_countries = None
+
+def normalize(text):
+    """Lowercases, strips accents and punctuation: "São Paulo" -> "sao paulo"."""
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c if c.isalnum() else " " for c in text if not unicodedata.combining(c))
+    return " ".join(text.casefold().split())
+
+def _index():
+    global _mm
+    if _mm is None:
+        with open(INDEX_FILE, "rb") as f:
+            _mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return _mm
+
+def _lower_bound(mm, target):
+    # Offset of the first line whose key is >= target
+    lo, hi = 0, len(mm)
+    while lo < hi:
+        start = mm.rfind(b"\n", 0, (lo + hi) // 2) + 1
+        if mm[start:mm.find(b"\t", start)] < target:
+            lo = mm.find(b"\n", start) + 1 or len(mm)
+        else:
+            hi = start
+    return lo
+
+def _scan(prefix, exact=False):
+    """Yields (key, Place) for every line whose key starts with (or equals) prefix."""
+    mm = _index()
+    target = prefix.encode("utf-8")
+    pos = _lower_bound(mm, target)
+    while pos < len(mm):
+        end = mm.find(b"\n", pos)
+        if end < 0: end = len(mm)
+        key, name, cc, lat, lon, tz = mm[pos:end].decode("utf-8").split("\t")
+        if (key != prefix) if exact else not key.startswith(prefix):
+            break
+        yield key, Place(name, cc, float(lat), float(lon), tz)
+        pos = end + 1
+
+def countries():
+    """Maps normalized country names and codes to ISO 3166 codes."""
+    global _countries
+    if _countries is None:
+        _countries = {}
+        with open(COUNTRIES_FILE, encoding="utf-8") as f:
+            for line in f:
+                cc, name = line.rstrip("\n").split("\t")
+                _countries[normalize(name)] = cc
+                _countries[cc.lower()] = cc
+    return _countries
+
+def lookup(name):
+    """All places whose name (or alias) matches exactly."""
+    return [p for _, p in _scan(normalize(name), exact=True)]
+
+def resolve(address):
+    """
+    Resolves free text like "Riyadh, SA" or "Makkah, Saudi Arabia" to a Place.
+    Parts after the first comma must name a country and narrow the match
+    down to it. Returns None rather than guessing when the named country has
+    no such city, or when a part is something the gazetteer doesn't record
+    (a state, a province), since "Paris, Texas" isn't Paris, FR.
+    """
+    parts = [normalize(p) for p in address.split(",") if p.strip()]
+    if not parts:
+        return None
+    matches = lookup(parts[0])
+    if not matches:
+        return None
+    codes = countries()
+    if any(p not in codes for p in parts[1:]):
+        return None
+    wanted = {codes[p] for p in parts[1:]}
+    if wanted:
+        matches = [p for p in matches if p.country in wanted]
+    return matches[0] if matches else None
+
+def search(text, limit=8):
+    """
+    As-you-type suggestions: prefix matches first, then close spellings of
+    keys that share the first letter.
+    """
+    query = normalize(text.split(",")[0])
+    if not query:
+        return []
+    found = {}
+    for _, p in _scan(query):
+        found.setdefault((p.name, p.country), p)
+        if len(found) >= limit:
+            return list(found.values())
+    if len(query) >= 3:
+        import difflib
+        block = {}
+        for key, p in _scan(query[0]):
+            block.setdefault(key, p)
+        for key in difflib.get_close_matches(query, block, n=limit, cutoff=0.75):
+            found.setdefault((block[key].name, block[key].country), block[key])
+    return list(found.values())[:limit]
+
+def from_timezone(tz):
+    """The main city of an IANA timezone (Asia/Riyadh -> Riyadh), used as an offline location guess."""
+    if not tz:
+        return None
+    city = tz.rsplit("/", 1)[-1].replace("_", " ")
+    for place in lookup(city):
+        if place.tz == tz:
+            return place
+    # Zones named after something other than a city, take the first place using it
+    needle = ("\t" + tz + "\n").encode("utf-8")
+    mm = _index()
+    pos = mm.find(needle)
+    if pos < 0:
+        return None
+    start = mm.rfind(b"\n", 0, pos) + 1
+    key, name, cc, lat, lon, tz = mm[start:pos + len(needle) - 1].decode("utf-8").split("\t")
+    return Place(name, cc, float(lat), float(lon), tz)
+
+def host_timezone():
+    """Best effort IANA name of the machine's timezone, or None."""
+    tz = os.getenv("TZ", "").lstrip(":")
+    if "/" in tz:
+        return tz
+    try:
+        path = os.path.realpath("/etc/localtime")
+        return path.split("zoneinfo/", 1)[1] if "zoneinfo/" in path else None
+    except OSError:
+        return None
+
+def display(place):
+    return f"{place.name}, {place.country}"
+
+# --- Index building ---
+def places():
+    """Every distinct place in the index, aliases collapsed."""
+    seen = set()
+    for _, p in _scan(""):
+        if p not in seen:
+            seen.add(p)
+            yield p
+
+def _read_extra(path):
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.startswith("#") or not line.strip():
+                continue
+            cols = line.rstrip("\n").split("\t")
+            name, cc, lat, lon, tz = cols[:5]
+            aliases = cols[5].split(",") if len(cols) > 5 and cols[5] else []
+            yield [name] + aliases, Place(name, cc, float(lat), float(lon), tz)
+
+def _dms(value, deg_digits):
+    # zone.tab coordinates look like +2438+04643 or +404251-0740023
+    sign = -1 if value[0] == "-" else 1
+    digits = value[1:]
+    deg, rest = int(digits[:deg_digits]), digits[deg_digits:]
+    minutes = int(rest[:2])
+    seconds = int(rest[2:4]) if len(rest) > 2 else 0
+    return sign * (deg + minutes / 60 + seconds / 3600)
+
+def _read_zonetab(path):
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.startswith("#"):
+                continue
+            cc, coords, tz = line.rstrip("\n").split("\t")[:3]
+            split = max(coords.rfind("+"), coords.rfind("-"))
+            lat, lon = _dms(coords[:split], 2), _dms(coords[split:], 3)
+            name = tz.rsplit("/", 1)[-1].replace("_", " ")
+            yield [name], Place(name, cc.split(",")[0], round(lat, 4), round(lon, 4), tz)
+
+def _read_geonames(path):
+    # http://download.geonames.org/export/dump/ cities*.txt
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            cols = line.rstrip("\n").split("\t")
+            place = Place(cols[1], cols[8], float(cols[4]), float(cols[5]), cols[17])
+            yield [cols[1], cols[2]], place
+
+def build(out=INDEX_FILE, zonetab=None, geonames=None, iso3166=None):
+    """Writes a sorted index from the bundled extras plus optional tz/GeoNames dumps."""
+    sources = [_read_extra(EXTRA_FILE)]
+    if zonetab: sources.append(_read_zonetab(zonetab))
+    if geonames: sources.append(_read_geonames(geonames))
+
+    rows, seen = [], set()
+    for rank, (names, place) in enumerate(p for src in sources for p in src):
+        for name in names:
+            key = normalize(name)
+            # Earlier sources win, so the curated list overrides the dumps
+            if not key or (key, place.country) in seen:
+                continue
+            seen.add((key, place.country))
+            rows.append((key.encode("utf-8"), rank, place))
+    rows.sort(key=lambda r: (r[0], r[1]))
+
+    tmp = out + ".tmp"
+    with open(tmp, "w", encoding="utf-8", newline="\n") as f:
+        for k, _, p in rows:
+            f.write(f"{k.decode('utf-8')}\t{p.name}\t{p.country}\t{p.lat}\t{p.lon}\t{p.tz}\n")
+    os.replace(tmp, out)
+
+    if iso3166:
+        with open(iso3166, encoding="utf-8") as src, open(COUNTRIES_FILE, "w", encoding="utf-8", newline="\n") as dst:
+            for line in src:
+                if not line.startswith("#"):
+                    dst.write(line)
+    return len(rows)
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Build or query the offline city index")
+    parser.add_argument("query", nargs="?")
+    parser.add_argument("--build", action="store_true")
+    parser.add_argument("--zonetab", default=None)
+    parser.add_argument("--geonames", default=None)
+    parser.add_argument("--iso3166", default=None)
+    args = parser.parse_args()
+    if args.build:
+        print(f"Wrote {build(zonetab=args.zonetab, geonames=args.geonames, iso3166=args.iso3166)} entries to {INDEX_FILE}")
+    elif args.query:
+        print(resolve(args.query))
+        for p in search(args.query): print("  ", display(p), p.tz)
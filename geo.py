@@ -0,0 +1,162 @@
+import math
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_right
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+import gazetteer
+
+# --- Qibla ---
+KAABA = (21.4225, 39.8262)
+
+def qibla(lat, lon):
+    """Initial great-circle bearing from (lat, lon) to the Kaaba, degrees clockwise from true north."""
+    phi, phi_k = math.radians(lat), math.radians(KAABA[0])
+    dlon = math.radians(KAABA[1] - lon)
+    bearing = math.degrees(math.atan2(math.sin(dlon), math.cos(phi) * math.tan(phi_k) - math.sin(phi) * math.cos(dlon)))
+    return round(bearing % 360, 2)
+
+# --- Offline timezone lookup ---
+# data/tzgrid.bin splits the world into 1/RES degree cells, each holding the
+# timezone its land lies in, sampled from the real zone boundaries when the
+# grid is built. Rows are run-length encoded, since neighbouring cells almost
+# always share a zone:
+#
+#   header  magic, version, cells per degree, zone count, run count
+#   zones   the IANA names, newline separated
+#   rows    offset of each row's first run (rows + 1 uint32)
+#   runs    first column of each run, then the zone of each run (uint16)
+#
+# A lookup is a bisect over one row's runs. Cells with no land are open sea
+# and get the nautical Etc/GMT zone for the longitude. A cell that straddles
+# a border is stored as AMBIGUOUS and the lookup gives up, so the caller can
+# ask the API rather than guess.
+
+GRID_FILE = os.path.join(gazetteer.DATA_DIR, "tzgrid.bin")
+MAGIC = b"PTZG"
+VERSION = 2
+RES = 4            # cells per degree
+OCEAN = 0xFFFF
+AMBIGUOUS = 0xFFFE
+
+_HEADER = struct.Struct("<4sHHHI")
+
+_grid = None
+
+def _load():
+    global _grid
+    if _grid is None:
+        with open(GRID_FILE, "rb") as f:
+            raw = f.read()
+        magic, version, res, n_zones, n_runs = _HEADER.unpack_from(raw, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{GRID_FILE}: not a version {VERSION} timezone grid")
+        pos = _HEADER.size
+        size = struct.unpack_from("<I", raw, pos)[0]; pos += 4
+        names = raw[pos:pos + size].decode("utf-8").split("\n"); pos += size
+        rows = array("I"); rows.frombytes(raw[pos:pos + (180 * res + 1) * 4]); pos += len(rows) * 4
+        starts = array("H"); starts.frombytes(raw[pos:pos + n_runs * 2]); pos += n_runs * 2
+        zones = array("H"); zones.frombytes(raw[pos:pos + n_runs * 2])
+        if sys.byteorder == "big":
+            for a in (rows, starts, zones): a.byteswap()
+        _grid = res, names, rows, starts, zones
+    return _grid
+
+def _nautical(lon):
+    hours = round(lon / 15)
+    # Etc/ names have the sign flipped: Etc/GMT-3 is UTC+3
+    return "Etc/GMT" if hours == 0 else f"Etc/GMT{-hours:+d}"
+
+def timezone_at(lat, lon):
+    """IANA timezone name for a point, from the bundled grid. None near a border."""
+    res, names, rows, starts, zones = _load()
+    r = min(max(int((90 - lat) * res), 0), 180 * res - 1)
+    c = int((lon + 180) * res) % (360 * res)
+    i = bisect_right(starts, c, rows[r], rows[r + 1]) - 1
+    z = zones[i]
+    if z == AMBIGUOUS:
+        return None
+    return _nautical(lon) if z == OCEAN else names[z]
+
+# --- Local clocks ---
+@lru_cache(maxsize=64)
+def zone(tz):
+    """tzinfo for an IANA name or a "UTC+3" label. Raises ValueError for a zone the system has no data for."""
+    try:
+        if tz.startswith("UTC") and tz != "UTC":
+            # astro.compute_timings labels fixed offsets "UTC+3"
+            return timezone(timedelta(hours=float(tz[3:])))
+        from zoneinfo import ZoneInfo
+        return ZoneInfo(tz)
+    except Exception:
+        raise ValueError(f"Unknown timezone {tz!r} (is tzdata installed?)") from None
+
+def now_in(tz=None):
+    """
+    Wall clock time at `tz` (IANA name, "UTC+3" or hours east of UTC) as a
+    naive datetime, so it compares directly with a location's "HH:MM"
+    timings. None means the host clock. Raises ValueError for a zone the
+    system has no data for, rather than passing the host clock off as it.
+    """
+    if tz is None or tz == "":
+        return datetime.now()
+    tzinfo = timezone(timedelta(hours=tz)) if isinstance(tz, (int, float)) else zone(tz)
+    return datetime.now(tzinfo).replace(tzinfo=None)
+
+# --- Building the grid ---
+def build(out=GRID_FILE, res=RES):
+    """Writes the grid from the zone boundaries bundled with timezonefinder (needed only to build). Returns the number of runs."""
+    from timezonefinder import TimezoneFinder
+    tf = TimezoneFinder(in_memory=True)
+    names, index = [], {}
+
+    def zone(lat, lon):
+        tz = tf.timezone_at_land(lng=lon, lat=lat)
+        if tz is None:
+            return None
+        if tz not in index:
+            index[tz] = len(names); names.append(tz)
+        return index[tz]
+
+    # Corners are shared between cells, so sample each row of them once
+    step = 1 / res
+    corners = [[zone(90 - r * step, min(-180 + c * step, 180)) for c in range(360 * res + 1)]
+               for r in range(180 * res + 1)]
+    rows, starts, zones = [0], [], []
+    for r in range(180 * res):
+        lat = 90 - (r + 0.5) * step
+        for c in range(360 * res):
+            samples = {corners[r][c], corners[r][c + 1], corners[r + 1][c], corners[r + 1][c + 1],
+                       zone(lat, -180 + (c + 0.5) * step)}
+            samples.discard(None)  # sea doesn't count against the land's zone
+            z = OCEAN if not samples else samples.pop() if len(samples) == 1 else AMBIGUOUS
+            if c == 0 or z != zones[-1]:
+                starts.append(c); zones.append(z)
+        rows.append(len(starts))
+
+    blob = "\n".join(names).encode("utf-8")
+    arrays = [array("I", rows), array("H", starts), array("H", zones)]
+    if sys.byteorder == "big":
+        for a in arrays: a.byteswap()
+    tmp = out + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, res, len(names), len(starts)))
+        f.write(struct.pack("<I", len(blob)) + blob)
+        for a in arrays: f.write(a.tobytes())
+    os.replace(tmp, out)
+    return len(starts)
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Build the timezone grid or look up a point")
+    parser.add_argument("point", nargs="?", help="lat,lon")
+    parser.add_argument("--build", action="store_true")
+    args = parser.parse_args()
+    if args.build:
+        print(f"Wrote {build()} runs to {GRID_FILE}")
+    elif args.point:
+        lat, lon = map(float, args.point.split(","))
+        tz = timezone_at(lat, lon)
+        print(f"timezone {tz}  qibla {qibla(lat, lon)}°  local time {now_in(tz):%Y-%m-%d %H:%M}")
@@ -0,0 +1,214 @@
+import math
+import os
+import sys
+from datetime import date, timedelta
+import gazetteer
+
+# --- Umm al-Qura Hijri calendar ---
+# data/ummalqura.tsv lists the Gregorian start of every Hijri month in
+# FIRST_YEAR..LAST_YEAR (hijri year, month, start date per line). It is built
+# by build() below from the Umm al-Qura rule: on the 29th of a month, if the
+# new moon's conjunction happens before sunset in Makkah and the moon sets
+# after the sun there, the next day starts a new month, otherwise the month
+# has 30 days. Conversions are table lookups, no network needed.
+#
+# From 1423 AH (2002) on, when Saudi Arabia adopted this rule, the table
+# agrees with the official calendar for all but a handful of months where
+# the moon sets within a minute of the sun. Before that the official
+# calendar used other criteria and often starts a day earlier.
+
+TABLE_FILE = os.path.join(gazetteer.DATA_DIR, "ummalqura.tsv")
+FIRST_YEAR, LAST_YEAR = 1400, 1500
+# build() walks forward from here; the rule pulls each month back onto the
+# lunation, so the table doesn't drift. 1 Muharram 1400 was 20 November 1979.
+ANCHOR = (FIRST_YEAR, 1, date(1979, 11, 20))
+SYNODIC = 29.530588861
+
+MONTHS_EN = ["Muharram", "Safar", "Rabi al-Awwal", "Rabi al-Thani", "Jumada al-Ula", "Jumada al-Akhirah",
+             "Rajab", "Shaban", "Ramadan", "Shawwal", "Dhu al-Qadah", "Dhu al-Hijjah"]
+MONTHS_AR = ["محرم", "صفر", "ربيع الأول", "ربيع الآخر", "جمادى الأولى", "جمادى الآخرة",
+             "رجب", "شعبان", "رمضان", "شوال", "ذو القعدة", "ذو الحجة"]
+RAMADAN, SHAWWAL, DHU_AL_HIJJAH = 9, 10, 12
+
+_starts = None  # ordinal of each month's first day, month index = (year - FIRST_YEAR) * 12 + month - 1
+
+def _table():
+    global _starts
+    if _starts is None:
+        with open(TABLE_FILE, encoding="utf-8") as f:
+            _starts = [date.fromisoformat(line.split("\t")[2].strip()).toordinal() for line in f if line.strip()]
+    return _starts
+
+def to_hijri(day):
+    """date -> (year, month, day) in the Umm al-Qura calendar, or None outside the table."""
+    starts = _table()
+    o = day.toordinal()
+    if not starts[0] <= o < starts[-1] + 30:
+        return None
+    # Months are 29 or 30 days, so the estimate is off by at most one
+    i = min(int((o - starts[0]) / SYNODIC), len(starts) - 1)
+    if starts[i] > o: i -= 1
+    elif i + 1 < len(starts) and starts[i + 1] <= o: i += 1
+    if i == len(starts) - 1 and o - starts[i] >= 30:
+        return None
+    return FIRST_YEAR + i // 12, i % 12 + 1, o - starts[i] + 1
+
+def to_gregorian(year, month, day=1):
+    """(year, month, day) -> date. Raises ValueError outside the table or past the month's end."""
+    i = (year - FIRST_YEAR) * 12 + month - 1
+    starts = _table()
+    if not (1 <= month <= 12 and 0 <= i < len(starts)) or not 1 <= day <= month_length(year, month):
+        raise ValueError(f"Hijri date {year}-{month}-{day} is out of range")
+    return date.fromordinal(starts[i] + day - 1)
+
+def month_length(year, month):
+    i = (year - FIRST_YEAR) * 12 + month - 1
+    starts = _table()
+    return starts[i + 1] - starts[i] if i + 1 < len(starts) else 30
+
+def to_hijri_many(days):
+    """to_hijri() over a sequence of dates. Uses numpy's searchsorted when it is already loaded."""
+    if "numpy" in sys.modules and len(days) > 64:
+        import numpy as np
+        starts = np.array(_table())
+        o = np.array([d.toordinal() for d in days])
+        i = np.searchsorted(starts, o, side="right") - 1
+        ok = (i >= 0) & (o < np.append(starts[1:], starts[-1] + 30)[np.clip(i, 0, None)])
+        return [(FIRST_YEAR + k // 12, k % 12 + 1, int(x - starts[k] + 1)) if good else None
+                for k, x, good in zip(i.tolist(), o, ok)]
+    return [to_hijri(d) for d in days]
+
+def is_ramadan(day):
+    h = to_hijri(day)
+    return h is not None and h[1] == RAMADAN
+
+def describe(day):
+    """The Hijri date in the shape of aladhan's `date.hijri`, or None outside the table."""
+    h = to_hijri(day)
+    if h is None:
+        return None
+    y, m, d = h
+    return {'date': f"{d:02}-{m:02}-{y}", 'format': "DD-MM-YYYY", 'day': f"{d:02}",
+            'month': {'number': m, 'en': MONTHS_EN[m - 1], 'ar': MONTHS_AR[m - 1]}, 'year': str(y)}
+
+# --- Ramadan and Eid ---
+def ramadan(year):
+    """(first day, last day) of Ramadan in Hijri `year`."""
+    start = to_gregorian(year, RAMADAN)
+    return start, start + timedelta(days=month_length(year, RAMADAN) - 1)
+
+def eid_al_fitr(year):
+    return to_gregorian(year, SHAWWAL, 1)
+
+def eid_al_adha(year):
+    return to_gregorian(year, DHU_AL_HIJJAH, 10)
+
+def upcoming(today=None):
+    """[(key, date)] for the next start of Ramadan, Eid al-Fitr and Eid al-Adha on or after today."""
+    today = today or date.today()
+    year = to_hijri(today)[0]
+    found = {}
+    for y in (year, year + 1):
+        for key, fn in (("ramadan", lambda y: ramadan(y)[0]), ("eid_al_fitr", eid_al_fitr), ("eid_al_adha", eid_al_adha)):
+            try:
+                d = fn(y)
+            except ValueError:
+                continue
+            if d >= today and key not in found:
+                found[key] = d
+    return sorted(found.items(), key=lambda kv: kv[1])
+
+# --- Building the table ---
+MAKKAH = (21.4225, 39.8262, 3)  # lat, lon, UTC offset
+DELTA_T = 69 / 86400             # TT - UT in days, close enough for this century
+
+def _sin(d): return math.sin(math.radians(d))
+def _cos(d): return math.cos(math.radians(d))
+
+def new_moon(k):
+    """Julian day (UT) of new moon number k, counted from January 2000 (Meeus, chapter 49)."""
+    t = k / 1236.85
+    jde = 2451550.09766 + SYNODIC * k + 0.00015437 * t * t - 0.00000015 * t ** 3 + 0.00000000073 * t ** 4
+    e = 1 - 0.002516 * t - 0.0000074 * t * t
+    m = 2.5534 + 29.1053567 * k - 0.0000014 * t * t - 0.00000011 * t ** 3
+    mp = 201.5643 + 385.81693528 * k + 0.0107582 * t * t + 0.00001238 * t ** 3 - 0.000000058 * t ** 4
+    f = 160.7108 + 390.67050284 * k - 0.0016118 * t * t - 0.00000227 * t ** 3 + 0.000000011 * t ** 4
+    om = 124.7746 - 1.56375588 * k + 0.0020672 * t * t + 0.00000215 * t ** 3
+    jde += (-0.40720 * _sin(mp) + 0.17241 * e * _sin(m) + 0.01608 * _sin(2 * mp) + 0.01039 * _sin(2 * f)
+            + 0.00739 * e * _sin(mp - m) - 0.00514 * e * _sin(mp + m) + 0.00208 * e * e * _sin(2 * m)
+            - 0.00111 * _sin(mp - 2 * f) - 0.00057 * _sin(mp + 2 * f) + 0.00056 * e * _sin(2 * mp + m)
+            - 0.00042 * _sin(3 * mp) + 0.00042 * e * _sin(m + 2 * f) + 0.00038 * e * _sin(m - 2 * f)
+            - 0.00024 * e * _sin(2 * mp - m) - 0.00017 * _sin(om) - 0.00007 * _sin(mp + 2 * m)
+            + 0.00004 * _sin(2 * mp - 2 * f) + 0.00004 * _sin(3 * m) + 0.00003 * _sin(mp + m - 2 * f)
+            + 0.00003 * _sin(2 * mp + 2 * f) - 0.00003 * _sin(mp + m + 2 * f) + 0.00003 * _sin(mp - m + 2 * f)
+            - 0.00002 * _sin(mp - m - 2 * f) - 0.00002 * _sin(3 * mp + m) + 0.00002 * _sin(4 * mp))
+    return jde - DELTA_T
+
+def moon_altitude(jd, lat, lon):
+    """
+    Geocentric altitude of the moon in degrees at Julian day `jd` (UT), and
+    the altitude at which it sets, from the Astronomical Almanac's low
+    precision series (good to a few tenths of a degree).
+    """
+    t = (jd - 2451545.0) / 36525
+    lam = (218.32 + 481267.881 * t + 6.29 * _sin(135.0 + 477198.87 * t) - 1.27 * _sin(259.3 - 413335.36 * t)
+           + 0.66 * _sin(235.7 + 890534.22 * t) + 0.21 * _sin(269.9 + 954397.74 * t)
+           - 0.19 * _sin(357.5 + 35999.05 * t) - 0.11 * _sin(186.5 + 966404.03 * t))
+    beta = (5.13 * _sin(93.3 + 483202.02 * t) + 0.28 * _sin(228.2 + 960400.89 * t)
+            - 0.28 * _sin(318.3 + 6003.15 * t) - 0.17 * _sin(217.6 - 407332.21 * t))
+    parallax = (0.9508 + 0.0518 * _cos(135.0 + 477198.87 * t) + 0.0095 * _cos(259.3 - 413335.36 * t)
+                + 0.0078 * _cos(235.7 + 890534.22 * t) + 0.0028 * _cos(269.9 + 954397.74 * t))
+    x = _cos(beta) * _cos(lam)
+    y = 0.9175 * _cos(beta) * _sin(lam) - 0.3978 * _sin(beta)
+    z = 0.3978 * _cos(beta) * _sin(lam) + 0.9175 * _sin(beta)
+    ra, dec = math.degrees(math.atan2(y, x)), math.degrees(math.asin(z))
+    gmst = 280.46061837 + 360.98564736629 * (jd - 2451545.0)
+    hour_angle = gmst + lon - ra
+    alt = math.degrees(math.asin(_sin(lat) * _sin(dec) + _cos(lat) * _cos(dec) * _cos(hour_angle)))
+    return alt, 0.7275 * parallax - 0.5667
+
+def _sunset_jd(day):
+    import astro
+    lat, lon, tz = MAKKAH
+    hours = astro.compute_hours(lat, lon, day, tz)['Sunset']
+    return day.toordinal() + 1721424.5 + (hours - tz) / 24
+
+def _starts_new_month(day29):
+    """Umm al-Qura test on the evening of a month's 29th day."""
+    sunset = _sunset_jd(day29)
+    k = round((sunset - 2451550.09766) / SYNODIC)
+    if new_moon(k) > sunset:
+        return False
+    alt, set_alt = moon_altitude(sunset, MAKKAH[0], MAKKAH[1])
+    return alt > set_alt
+
+def build(out=TABLE_FILE, last=LAST_YEAR):
+    """Writes the month-start table from ANCHOR through Hijri year `last`. Returns the number of months."""
+    y, m, s = ANCHOR
+    months = [(y, m, s)]
+    while (y, m) < (last, 12):
+        s = s + timedelta(days=29 if _starts_new_month(s + timedelta(days=28)) else 30)
+        y, m = (y + 1, 1) if m == 12 else (y, m + 1)
+        months.append((y, m, s))
+    tmp = out + ".tmp"
+    with open(tmp, "w", encoding="utf-8", newline="\n") as f:
+        for y, m, s in months:
+            f.write(f"{y}\t{m}\t{s.isoformat()}\n")
+    os.replace(tmp, out)
+    return len(months)
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Build the Umm al-Qura table or convert a date")
+    parser.add_argument("date", nargs="?", help="YYYY-MM-DD (Gregorian) or hijri YYYY-MM-DD with --to-gregorian")
+    parser.add_argument("--build", action="store_true")
+    parser.add_argument("--to-gregorian", action="store_true")
+    args = parser.parse_args()
+    if args.build:
+        print(f"Wrote {build()} months to {TABLE_FILE}")
+    elif args.to_gregorian:
+        print(to_gregorian(*map(int, args.date.split("-"))))
+    else:
+        d = date.fromisoformat(args.date) if args.date else date.today()
+        print(describe(d))
+        for key, when in upcoming(d): print(f"  {key:<12} {when}")
@@ -0,0 +1,120 @@
+import random
+import sys
+import threading
+import time
+from collections import deque
+
+# --- Shared HTTP client ---
+# Every network call in the app goes through get(). It keeps one pooled
+# keep-alive session, retries transient failures with exponential backoff
+# and full jitter inside an overall deadline, and merges identical requests
+# that are already in flight into a single round trip.
+
+POOL_SIZE = 16
+RETRIES = 3
+BACKOFF_BASE = 0.5   # seconds, doubled per attempt
+BACKOFF_MAX = 8.0
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+verbose = False          # print one latency line per request to stderr
+listeners = []           # callables(url, status, seconds, attempts)
+
+_session = None
+_session_lock = threading.Lock()
+_inflight = {}
+_inflight_lock = threading.Lock()
+_latencies = deque(maxlen=1000)
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+def session():
+    global _session
+    with _session_lock:
+        if _session is None:
+            import requests  # deferred, it is the slowest import in the app
+            from requests.adapters import HTTPAdapter
+            s = requests.Session()
+            adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+            s.mount("http://", adapter)
+            s.mount("https://", adapter)
+            _session = s
+    return _session
+
+def _backoff(attempt, res=None):
+    # Honour Retry-After on throttling, otherwise full jitter
+    if res is not None and res.headers.get("Retry-After", "").isdigit():
+        return min(float(res.headers["Retry-After"]), BACKOFF_MAX)
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+def _fetch(url, params, headers, timeout, deadline, retries):
+    import requests
+    s = session()
+    start = time.monotonic()
+    end = start + (deadline if deadline is not None else timeout * (retries + 1))
+    attempt = 0
+    while True:
+        remaining = end - time.monotonic()
+        res = error = None
+        try:
+            res = s.get(url, params=params, headers=headers, timeout=max(0.1, min(timeout, remaining)))
+            if res.status_code not in RETRY_STATUS:
+                break
+        except (requests.ConnectionError, requests.Timeout) as e:
+            error = e
+        wait = _backoff(attempt, res)
+        if attempt >= retries or time.monotonic() + wait >= end:
+            break
+        time.sleep(wait)
+        attempt += 1
+    _record(res.url if res is not None else url, res.status_code if res is not None else None,
+            time.monotonic() - start, attempt + 1)
+    if res is None:
+        raise error
+    return res
+
+def get(url, params=None, headers=None, timeout=10, deadline=None, retries=RETRIES):
+    """
+    GET with pooling, retries and coalescing. `timeout` bounds each attempt,
+    `deadline` (seconds) bounds the whole call including backoff sleeps.
+    Returns a requests.Response; raises on connection errors once retries are spent.
+    """
+    key = (url, tuple(sorted((params or {}).items())), tuple(sorted((headers or {}).items())))
+    with _inflight_lock:
+        call = _inflight.get(key)
+        leader = call is None
+        if leader:
+            call = _inflight[key] = _Call()
+    if not leader:
+        call.done.wait()
+        if call.error: raise call.error
+        return call.result
+    try:
+        call.result = _fetch(url, params, headers, timeout, deadline, retries)
+        return call.result
+    except BaseException as e:
+        call.error = e
+        raise
+    finally:
+        with _inflight_lock:
+            del _inflight[key]
+        call.done.set()
+
+def _record(url, status, seconds, attempts):
+    _latencies.append(seconds)
+    if verbose:
+        print(f"[http] {status or 'ERR'} {seconds * 1000:.0f} ms x{attempts} {url}", file=sys.stderr)
+    for fn in listeners:
+        try: fn(url, status, seconds, attempts)
+        except Exception: pass
+
+def stats():
+    """Latency summary (ms) over the most recent requests."""
+    samples = sorted(_latencies)
+    if not samples:
+        return {"count": 0}
+    pick = lambda q: round(samples[min(len(samples) - 1, int(len(samples) * q))] * 1000, 1)
+    return {"count": len(samples), "p50": pick(0.5), "p90": pick(0.9), "p99": pick(0.99), "max": pick(1.0)}
@@ -0,0 +1,34 @@
+from functools import lru_cache
+import languages
+import utils
+
+# --- Precompiled localization ---
+# Arabic reshaping and bidi reordering are slow, and the UI asks for the same
+# handful of strings every second. Each language's table is built once on
+# first use.
+
+PRAYERS = ['Fajr', 'Sunrise', 'Dhuhr', 'Asr', 'Maghrib', 'Isha']
+
+@lru_cache(maxsize=None)
+def gui(lang):
+    """
+    Display-ready GUI strings for `lang` (falling back to English per key):
+    every LANG_DATA string reshaped, plus 'prayers_upper' for the next-prayer label.
+    """
+    base = languages.LANG_DATA['en']
+    d = languages.LANG_DATA.get(lang, base)
+    table = {k: utils.fix_text(d.get(k, v), lang) for k, v in base.items() if isinstance(v, str)}
+    table['dir'] = d.get('dir', 'ltr')
+    table['prayers'] = {p: utils.fix_text(d['prayers'].get(p, p), lang) for p in base['prayers']}
+    table['prayers_upper'] = {p: t.upper() for p, t in table['prayers'].items()}
+    return table
+
+@lru_cache(maxsize=None)
+def cli(lang):
+    """CLI_TEXTS for `lang` plus 'prayer_names' keyed by the API's prayer names."""
+    table = dict(languages.CLI_TEXTS.get(lang, languages.CLI_TEXTS['en']))
+    table['prayer_names'] = {p: table.get(p.lower(), p) for p in PRAYERS}
+    return table
+
+def clear():
+    gui.cache_clear(); cli.cache_clear()
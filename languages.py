@@ -48,4 +48,66 @@ LANG_DATA = {
         "mismatch": "⚠️ ورژن کا تضاد: v",
         "prayers": {"Fajr": "فجر", "Sunrise": "طلوع", "Dhuhr": "ظہر", "Asr": "عصر", "Maghrib": "مغرب", "Isha": "عشاء"}
     }
-}
\ No newline at end of file
+}
+
+# Strings for the terminal tool (prayer_times_cli.py)
+CLI_TEXTS = {
+    "en": {
+        "app_name": "PRAYER TIME CLI",
+        "welcome": "Welcome to MH7Q Prayer Tool",
+        "loc_prompt": "📍 Enter Location (e.g., Riyadh, London): ",
+        "loading": "Fetching data for",
+        "error_loc": "❌ Error: Could not find that location.",
+        "error_conn": "❌ Connection Error: Check your internet.",
+        "next_prayer": "NEXT PRAYER",
+        "time_left": "TIME LEFT",
+        "saved_loc": "📍 Using saved location:",
+        "tomorrow": "Tomorrow",
+        "month_gen": "📅 Generating Monthly Schedule...",
+        "month_done": "✅ Saved schedule to:",
+        "qibla": "Qibla Direction",
+        "gregorian": "Gregorian",
+        "hijri": "Hijri",
+        "timezone": "Timezone",
+        "ramadan": "Ramadan",
+        "eid_al_fitr": "Eid al-Fitr",
+        "eid_al_adha": "Eid al-Adha",
+        "today": "today",
+        "days": "days",
+        "fajr": "Fajr",
+        "sunrise": "Sunrise",
+        "dhuhr": "Dhuhr",
+        "asr": "Asr",
+        "maghrib": "Maghrib",
+        "isha": "Isha"
+    },
+    "ar": {
+        "app_name": "أداة أوقات الصلاة",
+        "welcome": "أهلاً بك في أداة MH7Q للصلاة",
+        "loc_prompt": "📍 أدخل الموقع (مثال: Riyadh, Dubai): ",
+        "loading": "جاري جلب البيانات لـ",
+        "error_loc": "❌ خطأ: لم يتم العثور على الموقع.",
+        "error_conn": "❌ خطأ في الاتصال: تأكد من الإنترنت.",
+        "next_prayer": "الصلاة القادمة",
+        "time_left": "الوقت المتبقي",
+        "saved_loc": "📍 الموقع المحفوظ:",
+        "tomorrow": "غداً",
+        "month_gen": "📅 جاري إنشاء جدول الشهر...",
+        "month_done": "✅ تم حفظ الجدول في:",
+        "qibla": "اتجاه القبلة",
+        "gregorian": "ميلادي",
+        "hijri": "هجري",
+        "timezone": "المنطقة الزمنية",
+        "ramadan": "رمضان",
+        "eid_al_fitr": "عيد الفطر",
+        "eid_al_adha": "عيد الأضحى",
+        "today": "اليوم",
+        "days": "يوم",
+        "fajr": "الفجر",
+        "sunrise": "الشروق",
+        "dhuhr": "الظهر",
+        "asr": "العصر",
+        "maghrib": "المغرب",
+        "isha": "العشاء"
+    }
+}
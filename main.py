@@ -1,16 +1,13 @@
+import time
+STARTED = time.perf_counter()  # time-to-first-paint counts from here
 import tkinter as tk
 from tkinter import ttk, messagebox
-import webbrowser
 import threading
-from datetime import datetime, timedelta
-import pystray
-from PIL import Image, ImageDraw
+from datetime import timedelta
 import sys
-import time
 import os
-import locale
-import arabic_reshaper
-from bidi.algorithm import get_display
+# pystray and PIL are imported by the code paths that use them, after the
+# window is already on screen; pygame only shortly before a prayer (audio.py).
 
 # --- IMPORT YOUR MODULES ---
 import config
@@ -18,6 +15,14 @@ import api
 import utils
 import languages
 import startup
+import gazetteer
+import geo
+import scheduler
+import l10n
+import status
+import metrics
+import audio
+import fetcher
 
 APP_VERSION = "0.6"
 BG_COLOR = "#0f0f0f"
@@ -27,6 +32,13 @@ TEXT_DIM = "#888888"
 ACCENT_CYAN = "#00E5FF"
 ACCENT_GOLD = "#FFD700"
 ACCENT_RED = "#FF1744"
+METRICS_EVERY = 60  # seconds between metrics.json / metrics.prom dumps
+CONFIG_POLL = 5     # seconds between checks for settings changed by the CLI
+CONFIG_POLL_HIDDEN = 60  # same while in the tray, where only the adhan depends on them
+REFRESH_EVERY = 3600  # seconds between timings refreshes
+REFRESH_DEFER = 2000  # ms after a cached first paint before asking the network
+VERSION_CHECK_DELAY = 30  # seconds; retried later while a timings fetch is running
+FETCH_POLL = 100    # ms between checks for fetch results, only while one is outstanding
 
 class PrayerApp:
     def __init__(self, root):
@@ -37,20 +49,40 @@ class PrayerApp:
         self.root.protocol("WM_DELETE_WINDOW", self.minimize_to_tray)
         
         self.cfg = config.load_config()
-        # Default 24h if not set
-        if 'time_format' not in self.cfg: self.cfg['time_format'] = "24h"
+        config.subscribe(self.on_config_change)
         
         self.timings = {}
         self.mini_win = None
         self.settings_win = None
+        self.icon = None
+        self.sched = scheduler.Scheduler(self.on_prayer_event)
+        self.sched_job = None
+        self.clock_job = None
+        self.config_job = None
+        self.fetch_job = None
+        self.refresh_job = None
+        self.fetcher = fetcher.Fetcher(self.run_job)
+        self.loaded = None          # what load_schedule last showed, to skip identical refreshes
+        self.version_checked = False
+        self.shown = {}        # widget -> text it currently displays
+        self.layout_dir = None # 'ltr'/'rtl' the rows are packed for
+        metrics.install()
         
-        utils.init_audio()
         self.setup_ui()
         self.apply_lang()
+        # First paint comes from the last saved schedule (or the offline
+        # engine), the network refresh only once the window is up
+        if self.load_cached():
+            self.root.after(REFRESH_DEFER, self.request_data)
+        else:
+            self.request_data()
+        # Ticking stops while hidden and settings checks slow down, showing the window resumes both
+        self.root.bind("<Map>", lambda e: e.widget is self.root and self.resume())
         
         threading.Thread(target=self.setup_tray, daemon=True).start()
-        threading.Thread(target=self.data_loop, daemon=True).start()
-        self.root.after(1000, self.clock_loop)
+        self.resume()
+        self.root.after(VERSION_CHECK_DELAY * 1000, self.check_version)
+        self.root.after(METRICS_EVERY * 1000, self.metrics_loop)
 
     def setup_ui(self):
         self.header = tk.Frame(self.root, bg=BG_COLOR)
@@ -115,6 +147,23 @@ class PrayerApp:
         ent_city.pack(pady=5, padx=20, fill="x")
         ent_city.insert(0, self.cfg.get('city', ''))
 
+        # As-you-type suggestions from the offline city index
+        lst_city = tk.Listbox(self.settings_win, height=5, font=("Arial", 10), bg="#333", fg="white", bd=0, activestyle="none")
+        lst_city.pack(padx=20, fill="x")
+
+        def on_city_key(e):
+            lst_city.delete(0, tk.END)
+            for place in gazetteer.search(ent_city.get()):
+                lst_city.insert(tk.END, gazetteer.display(place))
+
+        def on_city_pick(e):
+            if lst_city.curselection():
+                ent_city.delete(0, tk.END)
+                ent_city.insert(0, lst_city.get(lst_city.curselection()[0]))
+
+        ent_city.bind("<KeyRelease>", on_city_key)
+        lst_city.bind("<<ListboxSelect>>", on_city_pick)
+
         def auto_detect_click():
             detected = api.get_current_location()
             ent_city.delete(0, tk.END)
@@ -124,87 +173,218 @@ class PrayerApp:
         tk.Button(self.settings_win, text="📍 Find My Location", bg="#444", fg=ACCENT_CYAN, command=auto_detect_click).pack(pady=10)
 
         def save():
+            self.cfg = dict(self.cfg)
             self.cfg['lang'] = lang_var.get()
             self.cfg['city'] = ent_city.get()
             self.cfg['time_format'] = format_var.get()
+            # on_config_change applies whatever actually changed
             config.save_config(self.cfg)
-            self.lbl_loc.config(text=self.cfg['city'])
-            self.apply_lang()
-            threading.Thread(target=self.fetch_data, daemon=True).start()
             self.settings_win.destroy()
             
         tk.Button(self.settings_win, text="SAVE", bg=ACCENT_CYAN, font=("Arial", 11, "bold"), command=save).pack(pady=20)
 
     # --- CORE LOGIC ---
-    def data_loop(self):
-        while True:
-            self.fetch_data()
-            time.sleep(3600)
+    def load_cached(self):
+        city = self.cfg.get('city', 'Riyadh')
+        cached = status.load(city) or status.compute_offline(city)
+        if not cached:
+            return False
+        timings, tomorrow, tz = cached
+        today = geo.now_in(tz).date()
+        self.load_schedule(timings, [(today, timings)] + ([(today + timedelta(days=1), tomorrow)] if tomorrow else []), tz)
+        return True
+
+    def request_data(self):
+        # Every fetch goes through the one worker; the same city in flight is joined, not repeated
+        self.submit(("timings", self.cfg.get('city', 'Riyadh')))
+        if self.refresh_job: self.root.after_cancel(self.refresh_job)
+        self.refresh_job = self.root.after(REFRESH_EVERY * 1000, self.request_data)
+
+    def check_version(self):
+        # Low priority: only runs while the worker is idle, and a timings request supersedes it
+        if self.version_checked: return
+        if not self.fetcher.busy():
+            self.submit(("version", APP_VERSION))
+        self.root.after(VERSION_CHECK_DELAY * 1000, self.check_version)
+
+    def submit(self, key):
+        self.fetcher.request(key)
+        if self.fetch_job is None:
+            self.fetch_job = self.root.after(FETCH_POLL, self.drain_fetches)
+
+    def run_job(self, key):
+        # Runs on the fetcher's worker thread, never touches Tk
+        kind, arg = key
+        return self.fetch_data(arg) if kind == "timings" else api.check_version_mismatch(arg)
+
+    def drain_fetches(self):
+        self.fetch_job = None
+        for (kind, arg), result in self.fetcher.drain():
+            if kind == "version":
+                self.version_checked = True
+                if result: self.root.title(f"Prayer Station v{APP_VERSION} (v{result} available)")
+            # A result for a city that's no longer selected is stale, even if it wasn't superseded in time
+            elif result and arg == self.cfg.get('city', 'Riyadh'):
+                self.load_schedule(*result)
+        if self.fetcher.busy():
+            self.fetch_job = self.root.after(FETCH_POLL, self.drain_fetches)
+
+    def fetch_data(self, city):
+        # Runs on the fetcher's worker thread, never touches Tk
+        data = api.fetch_prayer_times(city)
+        if not data:
+            return None
+        # Days and countdowns run on the city's clock, not the machine's
+        tz = data['meta'].get('timezone')
+        today = geo.now_in(tz).date(); tomorrow = today + timedelta(days=1)
+        # Tomorrow's real Fajr closes the 48h window; fall back to today's if unavailable
+        data_tmr = api.fetch_prayer_times(city, day=tomorrow) or data
+        days = [(today, data['timings']), (tomorrow, data_tmr['timings'])]
+        status.save(city, days, tz)
+        return data['timings'], days, tz
+
+    def load_schedule(self, timings, days, tz=None):
+        # The background refresh usually brings back what the cache already showed
+        shown = (tz, [(d, {k: v[:5] for k, v in t.items()}) for d, t in days])
+        if shown == self.loaded:
+            metrics.inc("refresh_unchanged_total", 1, "Timings refreshes that matched what was on screen")
+            return
+        self.loaded = shown
+        self.timings = timings
+        self.sched.tz = tz
+        self.sched.load(days)
+        self.refresh_times()
+        self.update_next_label()
+        self.arm_scheduler()
+
+    # --- EVENT SCHEDULER ---
+    def arm_scheduler(self):
+        if self.sched_job: self.root.after_cancel(self.sched_job)
+        delay = self.sched.seconds_until_next()
+        self.sched_job = None
+        if delay is not None:
+            # Capped so a wall clock change or a sleeping PC can't leave us waiting too long
+            self.sched_job = self.root.after(int(min(delay, 300) * 1000) + 1, self.on_scheduler_wake)
 
-    def fetch_data(self):
-        data = api.fetch_prayer_times(self.cfg.get('city', 'Riyadh'))
-        if data:
-            self.timings = data['timings']
-            self.root.after(0, self.refresh_times)
+    def on_scheduler_wake(self):
+        self.sched_job = None
+        self.sched.run_due()
+        # Also after a sleep, when the missed prayers are dropped without firing
+        self.update_next_label()
+        self.arm_scheduler()
 
+    def on_prayer_event(self, kind, prayer, when):
+        if kind == "rollover":
+            self.request_data()
+            return
+        if kind == "prewarm":
+            audio.prewarm(utils.ADHAN_FILE)
+            return
+        threading.Thread(target=audio.play, args=(utils.ADHAN_FILE,), daemon=True).start()
+        if self.icon:
+            l_code = self.cfg.get('lang', 'en')
+            d = languages.LANG_DATA.get(l_code, languages.LANG_DATA['en'])
+            try: self.icon.notify(f"{d['prayers'][prayer]} {when:%H:%M}", "Prayer Station")
+            except Exception: pass
+
+    @metrics.timed("ui_refresh", "Redrawing the prayer time labels")
     def refresh_times(self):
         fmt = self.cfg.get('time_format', '24h')
         for p, (lbl_n, lbl_t, row) in self.p_widgets.items():
             if p in self.timings:
                 t_str = self.timings[p][:5]
                 if fmt == "12h":
-                    t_obj = datetime.strptime(t_str, "%H:%M")
-                    t_str = t_obj.strftime("%I:%M %p")
-                lbl_t.config(text=t_str)
+                    h, m = int(t_str[:2]), t_str[3:5]
+                    t_str = f"{(h - 1) % 12 + 1:02}:{m} {'AM' if h < 12 else 'PM'}"
+                self.set_text(lbl_t, t_str)
+
+    # --- RENDERING ---
+    def set_text(self, widget, text):
+        # Tk redraws on every config(), even with the same text; skip those
+        if self.shown.get(widget) != text:
+            widget.config(text=text)
+            self.shown[widget] = text
+
+    def is_visible(self):
+        if self.mini_win and self.mini_win.winfo_exists(): return True
+        return self.root.state() not in ("withdrawn", "iconic")
+
+    def resume(self):
+        # Ticks recompute from the wall clock, so a fresh tick is all the catch-up needed
+        if self.clock_job is None: self.clock_loop()
+        # Check the settings straight away on show, then at the faster rate
+        if self.config_job: self.root.after_cancel(self.config_job)
+        self.config_loop()
 
     def clock_loop(self):
-        now = datetime.now()
-        if self.timings: self.update_countdown(now)
-        if self.mini_win and self.mini_win.winfo_exists():
-            self.mini_lbl.config(text=self.lbl_timer.cget("text"))
-        self.root.after(1000, self.clock_loop)
+        self.clock_job = None
+        if not self.is_visible():
+            return  # no ticks until shown again
+        with metrics.timed("countdown_tick", "One clock tick of the countdown"):
+            now = self.sched.now()
+            if self.sched.timeline: self.update_countdown(now)
+            if self.mini_win and self.mini_win.winfo_exists():
+                self.set_text(self.mini_lbl, self.shown.get(self.lbl_timer, "--:--:--"))
+        # Wake just after the next whole second so the display never skips one
+        self.clock_job = self.root.after(1000 - now.microsecond // 1000 + 5, self.clock_loop)
 
-    def update_countdown(self, now):
-        next_p = None; min_sec = 999999
-        l_code = self.cfg.get('lang', 'en')
-        d = languages.LANG_DATA.get(l_code, languages.LANG_DATA['en'])
-        
-        for p in ['Fajr', 'Dhuhr', 'Asr', 'Maghrib', 'Isha']:
-            if p not in self.timings: continue
-            p_dt = now.replace(hour=int(self.timings[p][:2]), minute=int(self.timings[p][3:5]), second=0)
-            if p_dt > now:
-                diff = (p_dt - now).total_seconds()
-                if diff < min_sec: min_sec = diff; next_p = p
-        
-        if not next_p: # Next is tomorrow's Fajr
-            next_p = 'Fajr'
-            p_dt = (now + timedelta(days=1)).replace(hour=int(self.timings['Fajr'][:2]), minute=int(self.timings['Fajr'][3:5]), second=0)
-            min_sec = (p_dt - now).total_seconds()
+    def config_loop(self):
+        # Only a stat() when nothing changed. Keeps running in the tray, so a
+        # city set from the CLI moves the adhan without opening the window
+        config.poll()
+        every = CONFIG_POLL if self.is_visible() else CONFIG_POLL_HIDDEN
+        self.config_job = self.root.after(every * 1000, self.config_loop)
 
+    def on_config_change(self, cfg, changed):
+        self.cfg = cfg
+        if 'city' in changed:
+            self.set_text(self.lbl_loc, cfg['city'])
+            self.request_data()
+        if changed & {'lang', 'time_format'}:
+            self.apply_lang()
+
+    def metrics_loop(self):
+        threading.Thread(target=metrics.dump, daemon=True).start()
+        self.root.after(METRICS_EVERY * 1000, self.metrics_loop)
+
+    def update_countdown(self, now):
+        next_p, p_dt = self.sched.next_prayer(now)
+        if not next_p: return
+        min_sec = (p_dt - now).total_seconds()
         h, m, s = int(min_sec//3600), int((min_sec%3600)//60), int(min_sec%60)
-        translated_p = utils.fix_text(d['prayers'][next_p], l_code)
-        self.lbl_next.config(text=f"{translated_p.upper()}")
-        self.lbl_timer.config(text=f"{h:02}:{m:02}:{s:02}")
+        self.set_text(self.lbl_timer, f"{h:02}:{m:02}:{s:02}")
+
+    def update_next_label(self):
+        # Only changes when the scheduler wakes, not on every clock tick
+        next_p, _ = self.sched.next_prayer()
+        if not next_p: return
+        self.set_text(self.lbl_next, l10n.gui(self.cfg.get('lang', 'en'))['prayers_upper'][next_p])
 
     # (Add your standard apply_lang, toggle_mini_mode, setup_tray, etc. here)
     def apply_lang(self):
-        l_code = self.cfg.get('lang', 'en')
-        d = languages.LANG_DATA.get(l_code, languages.LANG_DATA['en'])
-        is_rtl = d.get('dir') == 'rtl'
-        self.lbl_title.config(text=utils.fix_text(d['title'], l_code))
-        self.btn_hud.pack_forget(); self.btn_sets.pack_forget()
-        if is_rtl:
-            self.btn_hud.pack(side="right"); self.btn_sets.pack(side="left")
-        else:
-            self.btn_hud.pack(side="left"); self.btn_sets.pack(side="right")
+        d = l10n.gui(self.cfg.get('lang', 'en'))
+        self.set_text(self.lbl_title, d['title'])
         for p, (lbl_n, lbl_t, row) in self.p_widgets.items():
-            lbl_n.pack_forget(); lbl_t.pack_forget()
-            lbl_n.config(text=utils.fix_text(d['prayers'][p], l_code))
-            if is_rtl: lbl_n.pack(side="right"); lbl_t.pack(side="left")
-            else: lbl_n.pack(side="left"); lbl_t.pack(side="right")
+            self.set_text(lbl_n, d['prayers'][p])
+        if d['dir'] != self.layout_dir:
+            # Re-packing makes Tk recompute the whole layout, only do it when the direction flips
+            self.layout_dir = d['dir']
+            is_rtl = d['dir'] == 'rtl'
+            self.btn_hud.pack_forget(); self.btn_sets.pack_forget()
+            if is_rtl:
+                self.btn_hud.pack(side="right"); self.btn_sets.pack(side="left")
+            else:
+                self.btn_hud.pack(side="left"); self.btn_sets.pack(side="right")
+            for p, (lbl_n, lbl_t, row) in self.p_widgets.items():
+                lbl_n.pack_forget(); lbl_t.pack_forget()
+                if is_rtl: lbl_n.pack(side="right"); lbl_t.pack(side="left")
+                else: lbl_n.pack(side="left"); lbl_t.pack(side="right")
+        self.refresh_times()
+        self.update_next_label()
 
     def toggle_mini_mode(self):
-        if self.mini_win and self.mini_win.winfo_exists(): self.mini_win.destroy(); return
+        if self.mini_win and self.mini_win.winfo_exists():
+            self.mini_win.destroy(); self.shown.pop(self.mini_lbl, None); return
         self.mini_win = tk.Toplevel(self.root)
         self.mini_win.overrideredirect(True)
         self.mini_win.attributes("-topmost", True, "-alpha", 0.8)
@@ -212,6 +392,7 @@ class PrayerApp:
         self.mini_win.configure(bg=CARD_COLOR)
         self.mini_lbl = tk.Label(self.mini_win, text="--:--:--", fg=ACCENT_CYAN, bg=CARD_COLOR, font=("Courier New", 14, "bold"))
         self.mini_lbl.pack(expand=True)
+        self.resume()  # the HUD keeps ticking while the main window is in the tray
         def start_move(e): self.x, self.y = e.x, e.y
         def on_move(e):
             nx = self.mini_win.winfo_x() + (e.x - self.x)
@@ -220,9 +401,11 @@ class PrayerApp:
         self.mini_win.bind("<Button-1>", start_move); self.mini_win.bind("<B1-Motion>", on_move)
 
     def setup_tray(self):
+        import pystray
+        from PIL import Image, ImageDraw
         img = Image.new('RGB', (64, 64), (15,15,15))
         d = ImageDraw.Draw(img); d.ellipse((10,10,54,54), fill=(0, 230, 118))
-        self.icon = pystray.Icon("PrayerStation", img, "Prayer Station", (pystray.MenuItem('Show', lambda: self.root.after(0, self.root.deiconify())), pystray.MenuItem('Quit', lambda: os._exit(0))))
+        self.icon = pystray.Icon("PrayerStation", img, "Prayer Station", (pystray.MenuItem('Show', lambda: self.root.after(0, self.root.deiconify)), pystray.MenuItem('Quit', lambda: os._exit(0))))
         self.icon.run()
 
     def minimize_to_tray(self): self.root.withdraw()
@@ -230,4 +413,11 @@ class PrayerApp:
 if __name__ == "__main__":
     root = tk.Tk()
     app = PrayerApp(root)
+    root.after_idle(lambda: metrics.observe("first_paint", (time.perf_counter() - STARTED) * 1000,
+                                            "Process start to the first painted window"))
+    if "--startup-probe" in sys.argv:
+        # Used by benchmarks/startup.py: report first paint and exit
+        root.update()
+        print("painted", flush=True)
+        os._exit(0)
     root.mainloop()
\ No newline at end of file
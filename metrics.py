@@ -0,0 +1,173 @@
+import json
+import os
+import threading
+import time
+import paths
+
+# --- Runtime metrics and tracing ---
+# In-process counters and histograms, cheap enough to leave on everywhere.
+# The tray app dumps them periodically as metrics.json and metrics.prom (the
+# Prometheus text format, for node_exporter's textfile collector); the CLI
+# can print span timings for one run with --trace.
+
+BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+_lock = threading.Lock()
+_counters = {}    # name -> [help, value]
+_histograms = {}  # name -> Histogram
+
+class Histogram:
+    def __init__(self, help_text, buckets=BUCKETS_MS):
+        self.help = help_text
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, ms):
+        i = 0
+        while i < len(self.buckets) and ms > self.buckets[i]: i += 1
+        self.counts[i] += 1
+        self.sum += ms
+        self.count += 1
+        if ms > self.max: self.max = ms
+
+    def quantile(self, q):
+        # Upper bound of the bucket holding the q-th sample, good enough for a dashboard
+        if not self.count: return None
+        rank, seen = q * self.count, 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank:
+                return self.buckets[i] if i < len(self.buckets) else self.max
+        return self.max
+
+def inc(name, value=1, help_text=""):
+    with _lock:
+        entry = _counters.setdefault(name, [help_text, 0])
+        entry[1] += value
+
+def observe(name, ms, help_text=""):
+    with _lock:
+        h = _histograms.get(name)
+        if h is None: h = _histograms[name] = Histogram(help_text)
+        h.observe(ms)
+
+class timed:
+    """Context manager / decorator: records the block's duration (ms) in a histogram and as a trace span."""
+    def __init__(self, name, help_text=""):
+        self.name, self.help = name, help_text
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        if _trace is not None: _trace.enter(self.name)
+        return self
+
+    def __exit__(self, *exc):
+        ms = (time.perf_counter() - self.t0) * 1000
+        observe(self.name, ms, self.help)
+        if _trace is not None: _trace.exit(self.name, self.t0, ms)
+        return False
+
+    def __call__(self, fn):
+        def wrapper(*a, **kw):
+            with timed(self.name, self.help):
+                return fn(*a, **kw)
+        wrapper.__name__, wrapper.__doc__ = fn.__name__, fn.__doc__
+        return wrapper
+
+# --- Tracing ---
+class _Trace:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.spans = []   # (offset ms, duration ms, depth, name, thread)
+        self.depth = threading.local()
+
+    def enter(self, name):
+        self.depth.n = getattr(self.depth, "n", 0) + 1
+
+    def exit(self, name, t0, ms):
+        self.depth.n = max(0, getattr(self.depth, "n", 1) - 1)
+        with _lock:
+            self.spans.append(((t0 - self.start) * 1000, ms, self.depth.n, name, threading.current_thread().name))
+
+_trace = None
+
+def start_trace():
+    global _trace
+    _trace = _Trace()
+
+def trace_report():
+    """Spans of the current trace in start order, one indented line each."""
+    if _trace is None: return ""
+    lines = [f"{'start':>9} {'ms':>9}  span"]
+    for offset, ms, depth, name, thread in sorted(_trace.spans):
+        where = "" if thread == "MainThread" else f"  [{thread}]"
+        lines.append(f"{offset:9.1f} {ms:9.1f}  {'  ' * depth}{name}{where}")
+    lines.append(f"{'':>9} {(time.perf_counter() - _trace.start) * 1000:9.1f}  total")
+    return "\n".join(lines)
+
+# --- Export ---
+def _on_http(url, status, seconds, attempts):
+    observe("http_request", seconds * 1000, "HTTP request latency including retries")
+    inc("http_requests_total", 1, "HTTP requests made")
+    if status is None or status >= 400: inc("http_errors_total", 1, "HTTP requests that failed")
+    if attempts > 1: inc("http_retries_total", attempts - 1, "HTTP retry attempts")
+    if _trace is not None:
+        ms = seconds * 1000
+        _trace.enter("http"); _trace.exit(f"http {status or 'ERR'} x{attempts} {url.split('?')[0]}", time.perf_counter() - seconds, ms)
+
+def install():
+    """Hooks the shared HTTP client. Safe to call more than once."""
+    import http_client
+    if _on_http not in http_client.listeners:
+        http_client.listeners.append(_on_http)
+
+def snapshot():
+    with _lock:
+        out = {"timestamp": time.time(), "pid": os.getpid(),
+               "counters": {k: v for k, (_, v) in _counters.items()}, "histograms": {}}
+        for k, h in _histograms.items():
+            out["histograms"][k] = {"count": h.count, "sum_ms": round(h.sum, 3), "max_ms": round(h.max, 3),
+                                    "p50_ms": h.quantile(0.5), "p99_ms": h.quantile(0.99)}
+    return out
+
+def prometheus_text(prefix="prayer_"):
+    lines = []
+    with _lock:
+        for k, (help_text, v) in sorted(_counters.items()):
+            if help_text: lines.append(f"# HELP {prefix}{k} {help_text}")
+            lines += [f"# TYPE {prefix}{k} counter", f"{prefix}{k} {v}"]
+        for k, h in sorted(_histograms.items()):
+            name = f"{prefix}{k}_ms"
+            if h.help: lines.append(f"# HELP {name} {h.help}")
+            lines.append(f"# TYPE {name} histogram")
+            seen = 0
+            for bound, c in zip(list(h.buckets) + ["+Inf"], h.counts):
+                seen += c
+                lines.append(f'{name}_bucket{{le="{bound}"}} {seen}')
+            lines += [f"{name}_sum {h.sum:.3f}", f"{name}_count {h.count}"]
+    return "\n".join(lines) + "\n"
+
+def metrics_dir():
+    return os.getenv("PRAYER_METRICS_DIR") or paths.cache_dir()
+
+def dump(directory=None):
+    """Writes metrics.json and metrics.prom atomically. Errors are ignored."""
+    directory = directory or metrics_dir()
+    try:
+        os.makedirs(directory, exist_ok=True)
+        for name, body in (("metrics.json", json.dumps(snapshot(), indent=2)), ("metrics.prom", prometheus_text())):
+            path = os.path.join(directory, name)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f: f.write(body)
+            os.replace(tmp, path)
+    except OSError:
+        pass
+
+def reset():
+    global _trace
+    with _lock:
+        _counters.clear(); _histograms.clear()
+    _trace = None
@@ -0,0 +1,20 @@
+import os
+
+# --- Per-user locations ---
+# Kept free of heavy imports, the status line path reads from here.
+
+APP_DIR = "prayer-time-cli"
+
+def cache_dir():
+    if os.name == "nt":
+        base = os.getenv("LOCALAPPDATA") or os.path.expanduser("~")
+    else:
+        base = os.getenv("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, APP_DIR)
+
+def config_dir():
+    if os.name == "nt":
+        base = os.getenv("APPDATA") or os.path.expanduser("~")
+    else:
+        base = os.getenv("XDG_CONFIG_HOME") or os.path.expanduser("~/.config")
+    return os.path.join(base, APP_DIR)
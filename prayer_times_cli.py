@@ -1,13 +1,12 @@
-import requests
 import json
 import argparse
-import os
 import sys
 from datetime import datetime, date, timedelta
-
-
-# --- Configuration ---
-CONFIG_FILE = "config.json"
+import languages
+import l10n
+import config
+import geo
+# api and cache are imported where they're used, so --next stays light
 
 # --- Visuals ---
 BANNER = r"""
@@ -24,122 +23,130 @@ RED = "\033[91m"
 RESET = "\033[0m"
 BOLD = "\033[1m"
 
-TEXTS = {
-    "en": {
-        "app_name": "PRAYER TIME CLI",
-        "welcome": "Welcome to MH7Q Prayer Tool",
-        "loc_prompt": "📍 Enter Location (e.g., Riyadh, London): ",
-        "loading": "Fetching data for",
-        "error_loc": "❌ Error: Could not find that location.",
-        "error_conn": "❌ Connection Error: Check your internet.",
-        "next_prayer": "NEXT PRAYER",
-        "time_left": "TIME LEFT",
-        "saved_loc": "📍 Using saved location:",
-        "tomorrow": "Tomorrow",
-        "month_gen": "📅 Generating Monthly Schedule...",
-        "month_done": "✅ Saved schedule to:",
-        "qibla": "Qibla Direction",
-        "gregorian": "Gregorian",
-        "hijri": "Hijri",
-        "timezone": "Timezone",
-        "fajr": "Fajr",
-        "sunrise": "Sunrise",
-        "dhuhr": "Dhuhr",
-        "asr": "Asr",
-        "maghrib": "Maghrib",
-        "isha": "Isha"
-    },
-    "ar": {
-        "app_name": "أداة أوقات الصلاة",
-        "welcome": "أهلاً بك في أداة MH7Q للصلاة",
-        "loc_prompt": "📍 أدخل الموقع (مثال: Riyadh, Dubai): ",
-        "loading": "جاري جلب البيانات لـ",
-        "error_loc": "❌ خطأ: لم يتم العثور على الموقع.",
-        "error_conn": "❌ خطأ في الاتصال: تأكد من الإنترنت.",
-        "next_prayer": "الصلاة القادمة",
-        "time_left": "الوقت المتبقي",
-        "saved_loc": "📍 الموقع المحفوظ:",
-        "tomorrow": "غداً",
-        "month_gen": "📅 جاري إنشاء جدول الشهر...",
-        "month_done": "✅ تم حفظ الجدول في:",
-        "qibla": "اتجاه القبلة",
-        "gregorian": "ميلادي",
-        "hijri": "هجري",
-        "timezone": "المنطقة الزمنية",
-        "fajr": "الفجر",
-        "sunrise": "الشروق",
-        "dhuhr": "الظهر",
-        "asr": "العصر",
-        "maghrib": "المغرب",
-        "isha": "العشاء"
-    }
-}
+# Translations live in languages.py next to the GUI's
+TEXTS = languages.CLI_TEXTS
 
 def convert_to_12h(time_24):
-    try:
-        clean_time = time_24[:5]
-        time_obj = datetime.strptime(clean_time, "%H:%M")
-        return time_obj.strftime("%I:%M %p")
-    except:
+    from binstore import MISSING, to_minutes
+    m = to_minutes(time_24)
+    if m == MISSING:
         return time_24
+    h = m // 60
+    return f"{(h - 1) % 12 + 1:02}:{m % 60:02} {'AM' if h < 12 else 'PM'}"
 
-def generate_monthly_schedule(address, lang_code):
-    print(f"\n{YELLOW}{TEXTS[lang_code]['month_gen']}{RESET}")
+def generate_monthly_schedule(address, lang_code, methods=None):
+    print(f"\n{YELLOW}{l10n.cli(lang_code)['month_gen']}{RESET}")
+    import api
+    import hijri
     today = date.today()
-    url = f"http://api.aladhan.com/v1/calendarByAddress/{today.year}/{today.month}"
-    params = {'address': address, 'method': 4}
     try:
-        response = requests.get(url, params=params)
-        data = response.json()
+        if methods:
+            # Several methods side by side, computed together when the address is offline
+            by_method = api.fetch_month_methods(address, today.year, today.month, methods)
+        else:
+            days = api.fetch_month(address, today.year, today.month)
+            by_method = days and {None: days}
+        if by_method is None:
+            print(f"{RED}{l10n.cli(lang_code)['error_loc']}{RESET}")
+            return
         filename = f"Schedule_{address.replace(' ', '_')}_{today.month}_{today.year}.txt"
         with open(filename, "w", encoding="utf-8") as f:
             f.write(f"Prayer Schedule for {address}\n")
-            f.write("="*65 + "\n")
-            f.write(f"{'Date':<12} | {'Fajr':<9} | {'Dhuhr':<9} | {'Asr':<9} | {'Maghrib':<9} | {'Isha':<9}\n")
-            f.write("="*65 + "\n")
-            for day in data['data']:
-                d = day['date']['gregorian']['date']
-                t = day['timings']
-                f.write(f"{d:<12} | {convert_to_12h(t['Fajr']):<9} | {convert_to_12h(t['Dhuhr']):<9} | {convert_to_12h(t['Asr']):<9} | {convert_to_12h(t['Maghrib']):<9} | {convert_to_12h(t['Isha']):<9}\n")
-        print(f"{GREEN}{TEXTS[lang_code]['month_done']} {filename}{RESET}\n")
+            for method, days in by_method.items():
+                if method is not None:
+                    f.write(f"\nMethod {method}: {days[0]['meta']['method']['name']}\n")
+                f.write("="*80 + "\n")
+                f.write(f"{'Date':<12} | {'Hijri':<12} | {'Fajr':<9} | {'Dhuhr':<9} | {'Asr':<9} | {'Maghrib':<9} | {'Isha':<9}\n")
+                f.write("="*80 + "\n")
+                hijri_dates = hijri.to_hijri_many([datetime.strptime(day['date']['gregorian']['date'], "%d-%m-%Y").date() for day in days])
+                for day, h in zip(days, hijri_dates):
+                    d = day['date']['gregorian']['date']
+                    hd = f"{h[2]:02}-{h[1]:02}-{h[0]}" if h else day['date'].get('hijri', {}).get('date', "")
+                    t = day['timings']
+                    f.write(f"{d:<12} | {hd:<12} | {convert_to_12h(t['Fajr']):<9} | {convert_to_12h(t['Dhuhr']):<9} | {convert_to_12h(t['Asr']):<9} | {convert_to_12h(t['Maghrib']):<9} | {convert_to_12h(t['Isha']):<9}\n")
+        print(f"{GREEN}{l10n.cli(lang_code)['month_done']} {filename}{RESET}\n")
+    except Exception as e: print(f"{RED}Error: {e}{RESET}")
+
+def _reader_gone():
+    # The reader closed the pipe (`| head`): point stdout at devnull so the
+    # flush at exit doesn't raise again, and stop quietly
+    import os
+    os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    sys.exit(1)
+
+def export_schedule(address, spec, fmt, output, lang_code):
+    import export
+    filename = output or f"Schedule_{address.replace(' ', '_')}_{spec.replace('..', '_')}.{fmt}"
+    if filename != '-':
+        print(f"\n{YELLOW}{l10n.cli(lang_code)['month_gen']}{RESET}")
+    try:
+        if filename == '-':
+            try:
+                export.export_range(address, spec, sys.stdout, fmt)
+                sys.stdout.flush()
+            except BrokenPipeError:
+                _reader_gone()
+            return
+        # newline='' keeps csv/ics line endings exactly as written
+        with open(filename, "w", encoding="utf-8", newline="") as f:
+            export.export_range(address, spec, f, fmt)
+        print(f"{GREEN}{l10n.cli(lang_code)['month_done']} {filename}{RESET}\n")
     except Exception as e: print(f"{RED}Error: {e}{RESET}")
 
-def get_next_prayer(timings, lang_code):
-    now = datetime.now()
-    prayer_map_display = {
-        'Fajr': TEXTS[lang_code]['fajr'],
-        'Dhuhr': TEXTS[lang_code]['dhuhr'],
-        'Asr': TEXTS[lang_code]['asr'],
-        'Maghrib': TEXTS[lang_code]['maghrib'],
-        'Isha': TEXTS[lang_code]['isha']
-    }
+def get_next_prayer(timings, lang_code, tomorrow_timings=None, tz=None):
+    # Timings are wall clock times at the location, so compare against its clock, not the host's
+    now = geo.now_in(tz)
+    prayer_map_display = l10n.cli(lang_code)['prayer_names']
     
     for p_eng in ['Fajr', 'Dhuhr', 'Asr', 'Maghrib', 'Isha']:
         if p_eng not in timings: continue
-        p_time = datetime.strptime(timings[p_eng][:5], "%H:%M")
-        p_time_today = now.replace(hour=p_time.hour, minute=p_time.minute, second=0)
+        # Slicing "HH:MM" is much cheaper than strptime (and skips importing _strptime)
+        t = timings[p_eng]
+        p_time_today = now.replace(hour=int(t[:2]), minute=int(t[3:5]), second=0)
         
         if p_time_today > now:
             delta = p_time_today - now
             return prayer_map_display[p_eng], str(delta).split('.')[0], p_eng
 
-    fajr_time = datetime.strptime(timings['Fajr'][:5], "%H:%M")
-    tomorrow = datetime.now() + timedelta(days=1)
-    fajr_tomorrow = tomorrow.replace(hour=fajr_time.hour, minute=fajr_time.minute, second=0)
+    # After Isha: use tomorrow's actual Fajr when we have it
+    t = (tomorrow_timings or timings)['Fajr']
+    tomorrow = now + timedelta(days=1)
+    fajr_tomorrow = tomorrow.replace(hour=int(t[:2]), minute=int(t[3:5]), second=0)
     delta = fajr_tomorrow - now
-    tomorrow_txt = TEXTS[lang_code]['tomorrow']
+    tomorrow_txt = l10n.cli(lang_code)['tomorrow']
     return f"{prayer_map_display['Fajr']} ({tomorrow_txt})", str(delta).split('.')[0], 'Fajr'
 
-def load_config():
-    if os.path.exists(CONFIG_FILE):
-        try:
-            with open(CONFIG_FILE, 'r', encoding='utf-8') as f: return json.load(f)
-        except: return None
-    return None
+def print_status(fmt, address, lang_code):
+    """
+    One-line status output for bars and prompts. Reads only the precomputed
+    schedule (or computes offline), never the network.
+    """
+    import status
+    days = status.load(address) or status.compute_offline(address)
+    if not days:
+        print("--")
+        return
+    timings, tomorrow, tz = days
+    name, left, key = get_next_prayer(timings, lang_code, tomorrow, tz)
+    h, rest = left.split(":", 1)
+    after_isha = key == 'Fajr' and geo.now_in(tz).strftime("%H:%M") >= timings['Fajr'][:5]
+    at = ((tomorrow or timings) if after_isha else timings)[key][:5]
+    try:
+        print(fmt.format(name=name, prayer=key, left=f"{int(h):02}:{rest}", at=at))
+    except (KeyError, IndexError, ValueError) as e:
+        print(f"Bad --next-format: {e}", file=sys.stderr)
 
-def save_config(address, lang):
-    with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-        json.dump({"address": address, "lang": lang}, f, ensure_ascii=False)
+def print_events(lang_code):
+    """Next Ramadan and Eids from the local Umm al-Qura table."""
+    import hijri
+    T = l10n.cli(lang_code)
+    months = hijri.MONTHS_AR if lang_code == 'ar' else hijri.MONTHS_EN
+    today = date.today()
+    for key, when in hijri.upcoming(today):
+        y, m, d = hijri.to_hijri(when)
+        days = (when - today).days
+        left = T['today'] if days == 0 else f"{days} {T['days']}"
+        print(f"🌙 {T[key]:<16} {when.isoformat()}  ({d} {months[m - 1]} {y})  {CYAN}{left}{RESET}")
 
 def get_prayer_times():
     parser = argparse.ArgumentParser(add_help=False)
@@ -147,18 +154,102 @@ def get_prayer_times():
     parser.add_argument('-l', '--lang', type=str, choices=['en', 'ar'])
     parser.add_argument('--reset', action='store_true')
     parser.add_argument('--month', action='store_true')
+    parser.add_argument('--methods', type=str, metavar='ID,ID,...', help='with --month: compare calculation methods')
+    parser.add_argument('--cache-stats', action='store_true')
+    parser.add_argument('--batch', type=str, metavar='FILE')
+    parser.add_argument('--format', type=str, choices=['csv', 'jsonl', 'ics'], default='csv')
+    parser.add_argument('--range', type=str, metavar='YYYY-MM..YYYY-MM')
+    parser.add_argument('-o', '--output', type=str)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('-v', '--verbose', action='store_true')
+    parser.add_argument('--daemon', action='store_true')
+    parser.add_argument('--ask', type=str, metavar='CMD', choices=['next', 'today', 'ping'])
+    parser.add_argument('--next', action='store_true')
+    parser.add_argument('--next-format', type=str, default="{name} {left}")
+    parser.add_argument('--trace', action='store_true')
+    parser.add_argument('--events', action='store_true', help='upcoming Ramadan and Eid dates')
+    parser.add_argument('--broadcast', action='store_true', help='push prayer events to socket subscribers')
+    parser.add_argument('--listen', type=str, nargs='?', const='', metavar='PRAYER,...',
+                        help='print events from a running --broadcast, optionally only these prayers')
+    parser.add_argument('--port', type=int, default=None, help='with --broadcast/--listen: localhost TCP port instead of the Unix socket')
     args = parser.parse_args()
 
+    methods = None
+    if args.methods:
+        import astro
+        ids = [m.strip() for m in args.methods.split(',') if m.strip()]
+        bad = [m for m in ids if not m.isdigit() or int(m) not in astro.METHODS]
+        if bad:
+            parser.error(f"unknown method id(s) {', '.join(bad)}, expected some of {', '.join(map(str, astro.METHODS))}")
+        methods = [int(m) for m in ids] or None
+
+    if args.trace:
+        # Span timings for this run, printed to stderr on exit
+        import atexit
+        import metrics
+        metrics.start_trace(); metrics.install()
+        atexit.register(lambda: print("\n" + metrics.trace_report(), file=sys.stderr))
+
+    if args.next:
+        # Status line fast path: no banner, prompts or network
+        saved = config.stored()
+        print_status(args.next_format, args.address or saved.get('city'), args.lang or saved.get('lang', 'en'))
+        return
+
+    if args.events:
+        print_events(args.lang or config.stored().get('lang', 'en'))
+        return
+
+    if args.listen is not None:
+        # Needs no address, the broadcaster has one
+        import broadcaster
+        prayers = [p.strip().capitalize() for p in args.listen.split(',') if p.strip()]
+        try: broadcaster.listen({'prayers': prayers} if prayers else None, port=args.port)
+        except KeyboardInterrupt: pass
+        except OSError as e: print(f"{RED}No broadcaster running: {e}{RESET}")
+        return
+
+    if args.verbose:
+        import http_client
+        http_client.verbose = True
+
+    if args.batch:
+        if args.format == 'ics':
+            print(f"{RED}--batch supports csv or jsonl only{RESET}"); return
+        # Never reads or writes the saved config, output goes to stdout
+        import batch
+        try:
+            src = sys.stdin if args.batch == '-' else open(args.batch, encoding='utf-8')
+        except OSError as e:
+            print(f"{RED}Error: can't read {args.batch}: {e.strerror}{RESET}", file=sys.stderr); sys.exit(1)
+        with src:
+            try:
+                ok, failed = batch.run_batch(batch.read_addresses(src), sys.stdout, args.format, args.workers)
+                sys.stdout.flush()
+            except BrokenPipeError:
+                _reader_gone()
+        print(f"{ok} ok, {failed} failed", file=sys.stderr)
+        return
+
+    if args.cache_stats:
+        import cache
+        for k, v in cache.stats().items():
+            print(f"{k:<10} {v}")
+        return
+
     if args.reset:
-        if os.path.exists(CONFIG_FILE): os.remove(CONFIG_FILE)
+        config.reset()
         print(f"{GREEN}Settings reset.{RESET}")
         return
 
-    config = load_config()
+    # Only what the user saved: missing keys mean "ask", not the tray app's defaults
+    saved = config.stored()
     address, lang = None, None
 
     if args.lang: lang = args.lang
-    elif config and 'lang' in config: lang = config['lang']
+    elif 'lang' in saved:
+        # The tray app has languages the CLI has no texts for; keep those saved, print English
+        lang = saved['lang'] if saved['lang'] in TEXTS else 'en'
     else:
         print(GREEN + BANNER + RESET)
         print("1. English")
@@ -166,48 +257,91 @@ def get_prayer_times():
         choice = input(f"{BOLD}Choose Language / اختر اللغة (1/2): {RESET}").strip()
         lang = 'ar' if choice == '2' else 'en'
 
-    T = TEXTS[lang]
+    T = l10n.cli(lang)
+    keep_lang = args.lang or saved.get('lang') or lang
 
     if args.address:
         address = args.address
-        save_config(address, lang)
-    elif config and 'address' in config:
-        address = config['address']
-        if not args.month:
+        config.update(city=address, lang=keep_lang)  # no write if nothing changed
+    elif 'city' in saved:
+        address = saved['city']
+        if not (args.month or args.range or args.daemon or args.ask or args.broadcast):
             print(GREEN + BANNER + RESET)
             print(f"{YELLOW}{T['saved_loc']} {address}{RESET}")
     else:
         if not args.lang: print(GREEN + BANNER + RESET)
         print(f"{BOLD}{T['welcome']}{RESET}\n")
         address = input(T['loc_prompt']).strip()
-        save_config(address, lang)
+        config.update(city=address, lang=keep_lang)
 
     if args.month:
-        generate_monthly_schedule(address, lang)
+        generate_monthly_schedule(address, lang, methods)
+        return
+
+    if args.range:
+        export_schedule(address, args.range, args.format, args.output, lang)
         return
 
-    today = date.today().strftime("%d-%m-%Y")
-    url = f"http://api.aladhan.com/v1/timingsByAddress/{today}"
-    params = {'address': address, 'method': 4}
+    if args.broadcast:
+        import broadcaster
+        where = f"127.0.0.1:{args.port}" if args.port else broadcaster.socket_path()
+        print(f"{GREEN}Broadcasting {address} events on {where}{RESET}")
+        try: broadcaster.serve(address, port=args.port)
+        except KeyboardInterrupt: pass
+        except Exception as e: print(f"{RED}Error: {e}{RESET}")
+        return
+
+    if args.daemon or args.ask:
+        import daemon
+        if args.ask:
+            try:
+                print(json.dumps(daemon.ask(args.ask, address), ensure_ascii=False))
+            except LookupError:
+                print(f"{RED}{T['error_loc']}{RESET}", file=sys.stderr); sys.exit(1)
+            except Exception as e:
+                print(f"{RED}{T['error_conn']} {e}{RESET}", file=sys.stderr); sys.exit(1)
+            return
+        print(f"{GREEN}Serving {address} on {daemon.socket_path()}{RESET}")
+        try: daemon.serve(address)
+        except KeyboardInterrupt: pass
+        except Exception as e: print(f"{RED}Error: {e}{RESET}")
+        return
 
     print(f"\n🔄 {GREEN}{T['loading']} {address}...{RESET}")
 
+    import metrics
+    with metrics.timed("import_api"):
+        import api
+    import status
     try:
-        response = requests.get(url, params=params)
-        data = response.json()
+        with metrics.timed("fetch_today"):
+            data = api.fetch_today(address)
 
-        if response.status_code == 200 and data['code'] == 200:
-            timings = data['data']['timings']
-            meta = data['data']['meta']
-            date_hijri = data['data']['date']['hijri']
-            next_p_display, time_left, next_p_key = get_next_prayer(timings, lang)
+        if data:
+            timings = data['timings']
+            meta = data['meta']
+            # The location's date, which near midnight can differ from the host's
+            today = data['date']['gregorian']['date']
+            day = date(int(today[6:10]), int(today[3:5]), int(today[:2]))
+            tz = meta.get('timezone') or geo.timezone_at(float(meta['latitude']), float(meta['longitude']))
+            # aladhan sends the Hijri date; offline and cached days get it from the local table
+            import hijri
+            date_hijri = data['date'].get('hijri') or hijri.describe(day)
+            with metrics.timed("fetch_tomorrow"):
+                try: data_tmr = api.fetch_day(address, day + timedelta(days=1))
+                except Exception: data_tmr = None
+            with metrics.timed("status_save"):
+                status.save(address, [(day, timings)] + ([(day + timedelta(days=1), data_tmr['timings'])] if data_tmr else []), tz)
+            next_p_display, time_left, next_p_key = get_next_prayer(timings, lang, data_tmr and data_tmr['timings'], tz)
 
             print("\n" + "="*45)
             print(f"📅 {T['gregorian']}: {today}")
-            print(f"🌙 {T['hijri']}:     {date_hijri['day']} {date_hijri['month']['en']} {date_hijri['year']}")
-            qibla_dir = data['data']['meta'].get('qibla_direction', 'N/A')
+            if date_hijri:
+                print(f"🌙 {T['hijri']}:     {date_hijri['day']} {date_hijri['month']['en']} {date_hijri['year']}")
+            # Computed locally, aladhan's timings endpoints don't include the Qibla
+            qibla_dir = geo.qibla(float(meta['latitude']), float(meta['longitude']))
             print(f"🧭 {T['qibla']}:     {qibla_dir}°")
-            print(f"📍 {T['timezone']}:  {meta['timezone']}")
+            print(f"📍 {T['timezone']}:  {tz}")
             print("="*45)
             
             def p_row(key, val):
@@ -233,7 +367,9 @@ def get_prayer_times():
             
         else:
             print(f"\n{T['error_loc']}")
-            if os.path.exists(CONFIG_FILE): os.remove(CONFIG_FILE)
+            # Keep the rest of the settings, just don't remember an address that doesn't resolve
+            if address != saved.get('city'):
+                config.update(city=saved.get('city'))
 
     except Exception as e:
         # Print the actual error for debugging
@@ -0,0 +1,85 @@
+import heapq
+from bisect import bisect_right
+from datetime import datetime, timedelta
+import geo
+
+# --- Prayer event scheduler ---
+# Timings are parsed once into a sorted rolling timeline (today + tomorrow,
+# so after Isha the next prayer is tomorrow's real Fajr). Upcoming events sit
+# in a min-heap; the owner asks how long to sleep and wakes exactly then.
+
+PRAYERS = ['Fajr', 'Dhuhr', 'Asr', 'Maghrib', 'Isha']
+MISSED_GRACE = 120  # seconds; older events (e.g. after the PC slept) are dropped, not replayed
+PREWARM_LEAD = 90   # seconds before a prayer to get the adhan ready
+
+def build_timeline(days):
+    """
+    `days` is a list of (date, timings) pairs. Returns [(datetime, prayer), ...]
+    sorted by time, parsing each "HH:MM" string exactly once.
+    """
+    timeline = []
+    for day, timings in days:
+        for p in PRAYERS:
+            t = timings.get(p, "")
+            if len(t) < 5 or not t[:2].isdigit():
+                continue
+            timeline.append((datetime(day.year, day.month, day.day, int(t[:2]), int(t[3:5])), p))
+    timeline.sort()
+    return timeline
+
+class Scheduler:
+    """
+    Holds the timeline and a heap of pending events. Events are
+    (when, kind, prayer) with kind "prayer" at each prayer time, "prewarm"
+    PREWARM_LEAD seconds before it, and "rollover" once the timeline needs
+    tomorrow's data reloaded.
+
+    Times are wall clock times at the location, `tz` (None for the host
+    clock), so countdowns are right for places in another timezone.
+    """
+    def __init__(self, on_event, tz=None):
+        self.on_event = on_event
+        self.tz = tz
+        self.timeline = []
+        self._times = []
+        self._heap = []
+
+    def load(self, days, now=None):
+        now = now or self.now()
+        self.timeline = build_timeline(days)
+        self._times = [t for t, _ in self.timeline]
+        self._heap = [(t, "prayer", p) for t, p in self.timeline if t > now]
+        lead = timedelta(seconds=PREWARM_LEAD)
+        self._heap += [(max(t - lead, now), "prewarm", p) for t, p in self.timeline if t > now]
+        if self.timeline:
+            # Reload at midnight after the first day so the window keeps rolling
+            first = self.timeline[0][0]
+            midnight = datetime(first.year, first.month, first.day) + timedelta(days=1)
+            self._heap.append((max(midnight, now), "rollover", None))
+        heapq.heapify(self._heap)
+
+    def now(self):
+        return geo.now_in(self.tz)
+
+    def next_prayer(self, now=None):
+        """(prayer, datetime) of the next prayer after `now`, or (None, None)."""
+        now = now or self.now()
+        i = bisect_right(self._times, now)
+        return self.timeline[i][::-1] if i < len(self.timeline) else (None, None)
+
+    def seconds_until_next(self, now=None):
+        if not self._heap:
+            return None
+        now = now or self.now()
+        return max(0.0, (self._heap[0][0] - now).total_seconds())
+
+    def run_due(self, now=None):
+        """Fires every event that is due. Returns seconds until the next one, or None."""
+        now = now or self.now()
+        while self._heap and self._heap[0][0] <= now:
+            when, kind, prayer = heapq.heappop(self._heap)
+            late = (now - when).total_seconds()
+            if kind == "prayer" and late > MISSED_GRACE or kind == "prewarm" and late > PREWARM_LEAD:
+                continue
+            self.on_event(kind, prayer, when)
+        return self.seconds_until_next(now)
@@ -0,0 +1,61 @@
+import json
+import os
+from datetime import timedelta
+import geo
+import paths
+
+# --- Precomputed schedule for status lines ---
+# Normal runs (CLI, tray app, daemon) drop the days they already have into a
+# small JSON file. `prayer_times_cli.py --next` reads only that file, so a
+# status bar refresh never touches the network or the heavier modules.
+
+DEFAULT_FORMAT = "{name} {left}"
+
+def schedule_path():
+    return os.getenv("PRAYER_SCHEDULE_FILE") or os.path.join(paths.cache_dir(), "schedule.json")
+
+def save(address, days, tz=None):
+    """`days` is a list of (date, timings) at the location's timezone `tz`. Written atomically, errors are ignored."""
+    path = schedule_path()
+    body = {'address': address, 'timezone': tz,
+            'days': {d.isoformat(): {k: v[:5] for k, v in t.items()} for d, t in days}}
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(body, f, ensure_ascii=False)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+def load(address=None, today=None):
+    """
+    (today's timings, tomorrow's timings or None, timezone) from the file, or
+    None if it has no entry for today. Today is the location's, not the host's.
+    """
+    try:
+        with open(schedule_path(), encoding='utf-8') as f:
+            body = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if address and body.get('address') != address:
+        return None
+    tz = body.get('timezone')
+    try:
+        today = today or geo.now_in(tz).date()
+    except ValueError:
+        return None  # saved for a zone this system can't tell the time in
+    days = body.get('days', {})
+    if today.isoformat() not in days:
+        return None
+    return days[today.isoformat()], days.get((today + timedelta(days=1)).isoformat()), tz
+
+def compute_offline(address, today=None):
+    """Same shape as load(), computed locally when the address resolves without the network."""
+    import astro
+    loc = astro.resolve_location(address) if address else None
+    if not loc:
+        return None
+    lat, lon, tz = loc
+    today = today or geo.now_in(tz).date()
+    return tuple(astro.compute_timings(lat, lon, d, tz)['timings'] for d in (today, today + timedelta(days=1))) + (tz,)
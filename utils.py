@@ -1,7 +1,7 @@
-import os
-import pygame
-import arabic_reshaper
-from bidi.algorithm import get_display
+import sys
+
+# arabic_reshaper and bidi are imported on first use, they are among the
+# slowest imports in the app and many runs never need them.
 
 ADHAN_FILE = "adhan.mp3"
 
@@ -9,33 +9,24 @@ def fix_text(text, lang):
     """Reshapes Arabic text so letters connect properly."""
     if lang == "ar":
         try:
+            import arabic_reshaper
+            from bidi.algorithm import get_display
             reshaped = arabic_reshaper.reshape(text)
             return get_display(reshaped)
         except:
             return text
     return text
 
-def init_audio():
-    try:
-        pygame.mixer.init()
-    except: pass
-
+# Playback lives in audio.py, these stay for existing callers
 def play_adhan():
-    if os.path.exists(ADHAN_FILE):
-        try:
-            if not pygame.mixer.get_init(): pygame.mixer.init()
-            pygame.mixer.music.load(ADHAN_FILE)
-            pygame.mixer.music.play()
-            return True
-        except: return False
-    return False
+    import audio
+    return audio.play(ADHAN_FILE)
 
 def stop_audio():
-    try:
-        pygame.mixer.music.stop()
-    except: pass
+    audio = sys.modules.get("audio")
+    if audio is None: return  # never loaded, nothing is playing
+    audio.stop()
 
 def is_audio_playing():
-    try:
-        return pygame.mixer.music.get_busy()
-    except: return False
\ No newline at end of file
+    audio = sys.modules.get("audio")
+    return audio is not None and audio.is_playing()
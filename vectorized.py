@@ -0,0 +1,151 @@
+from datetime import date
+import numpy as np  # optional dependency: this module is only imported when numpy is installed
+import astro
+
+# --- Vectorized prayer time engine ---
+# The same PrayTimes math as astro.py, evaluated for every combination of
+# dates x locations x methods in one NumPy pass. A year for every method and
+# a list of cities is a few hundred thousand cells and takes milliseconds,
+# where astro.compute_hours would loop over each one in Python.
+#
+# Results are arrays of local fractional hours shaped (dates, locations,
+# methods), NaN where a time doesn't occur (polar days and nights).
+
+PRAYERS = astro.PRAYER_ORDER
+
+def _fix(a, b):
+    return a - b * np.floor(a / b)
+
+def _sun_position(jd):
+    d = jd - 2451545.0
+    g = np.radians(_fix(357.529 + 0.98560028 * d, 360))
+    q = _fix(280.459 + 0.98564736 * d, 360)
+    lam = np.radians(_fix(q + 1.915 * np.sin(g) + 0.020 * np.sin(2 * g), 360))
+    e = np.radians(23.439 - 0.00000036 * d)
+    ra = _fix(np.degrees(np.arctan2(np.cos(e) * np.sin(lam), np.cos(lam))) / 15, 24)
+    return np.degrees(np.arcsin(np.sin(e) * np.sin(lam))), q / 15 - ra
+
+def _offsets(tz, dates, months):
+    """UTC offsets in hours for one location, asking zoneinfo only around DST changes."""
+    if isinstance(tz, (int, float)):
+        return np.full(len(dates), float(tz))
+    out = np.empty(len(dates))
+    for (y, m), idx in months.items():
+        first = astro.tz_offset(tz, date(y, m, 1))
+        last = astro.tz_offset(tz, date(y + m // 12, m % 12 + 1, 1))
+        if first == last:
+            out[idx] = first
+        else:
+            out[idx] = [astro.tz_offset(tz, dates[i]) for i in idx]
+    return out
+
+def _method_params(methods):
+    fajr, isha_angle, isha_min, maghrib, jafari = [], [], [], [], []
+    for mid in methods:
+        m = astro.METHODS.get(mid, astro.METHODS[astro.DEFAULT_METHOD])
+        fajr.append(astro._parse_param(m["fajr"])[0])
+        value, minutes = astro._parse_param(m["isha"])
+        isha_angle.append(np.nan if minutes else value)
+        isha_min.append(value if minutes else np.nan)
+        maghrib.append(m.get("maghrib", np.nan))
+        jafari.append(m.get("midnight") == "jafari")
+    return [np.array(v) for v in (fajr, isha_angle, isha_min, maghrib, jafari)]
+
+def compute(dates, coords, methods=(astro.DEFAULT_METHOD,), school=0, ramadan=False):
+    """
+    Prayer times for every (date, location, method).
+
+    `dates` is a sequence of datetime.date, `coords` a sequence of
+    (lat, lon, tz) like astro.resolve_location() returns, `methods` aladhan
+    method ids. `ramadan` is a bool or one bool per date (Umm al-Qura's
+    two-hour Isha). Returns {prayer: float array of shape (D, L, M)}.
+    """
+    dates = list(dates)
+    lat = np.array([c[0] for c in coords], dtype=float)
+    lon = np.array([c[1] for c in coords], dtype=float)
+    fajr_a, isha_a, isha_m, maghrib_a, jafari = _method_params(methods)
+
+    # Julian day at local midnight of each (date, location)
+    jd = np.array([d.toordinal() + 1721424.5 for d in dates])[:, None] - lon[None, :] / 360
+    slat, clat = np.sin(np.radians(lat)), np.cos(np.radians(lat))
+
+    def mid_day(t):
+        return _fix(12 - _sun_position(jd + t)[1], 24)
+
+    def angle_time(angle, t, ccw=False):
+        # angle is scalar, (D, L) or (M,); the result broadcasts accordingly
+        decl, eqt = _sun_position(jd + t)
+        noon = _fix(12 - eqt, 24)
+        sd, cd = np.sin(np.radians(decl)), np.cos(np.radians(decl))
+        if np.ndim(angle) == 1:
+            sd, cd, noon = sd[..., None], cd[..., None], noon[..., None]
+            sl, cl = slat[:, None], clat[:, None]
+        else:
+            sl, cl = slat, clat
+        x = (-np.sin(np.radians(angle)) - sd * sl) / (cd * cl)
+        with np.errstate(invalid="ignore"):
+            diff = np.where(np.abs(x) <= 1, np.degrees(np.arccos(np.clip(x, -1, 1))) / 15, np.nan)
+        return noon - diff if ccw else noon + diff
+
+    decl_asr = _sun_position(jd + 13 / 24)[0]
+    asr_angle = -np.degrees(np.arctan(1 / ((2 if school == 1 else 1) + np.tan(np.radians(np.abs(lat - decl_asr))))))
+
+    # Method independent times are (D, L), the rest (D, L, M)
+    sunrise = angle_time(0.833, 6 / 24, ccw=True)[..., None]
+    sunset = angle_time(0.833, 18 / 24)[..., None]
+    dhuhr = mid_day(12 / 24)[..., None]
+    asr = angle_time(asr_angle, 13 / 24)[..., None]
+    fajr = angle_time(fajr_a, 5 / 24, ccw=True)
+    isha = angle_time(isha_a, 18 / 24)
+    maghrib = np.where(np.isnan(maghrib_a), sunset, angle_time(np.nan_to_num(maghrib_a), 18 / 24))
+
+    months = {}
+    for i, d in enumerate(dates):
+        months.setdefault((d.year, d.month), []).append(i)
+    offset = (np.stack([_offsets(c[2], dates, months) for c in coords], axis=1) - lon / 15)[..., None]
+    sunrise, sunset, dhuhr, asr = sunrise + offset, sunset + offset, dhuhr + offset, asr + offset
+    fajr, isha, maghrib = fajr + offset, isha + offset, maghrib + offset
+
+    # Angle based high latitude rule, as in astro._adjust_high_latitudes
+    with np.errstate(invalid="ignore"):
+        night = _fix(sunrise - sunset, 24)
+        valid = ~np.isnan(sunrise) & ~np.isnan(sunset)
+        portion = fajr_a / 60 * night
+        fajr = np.where(valid & (np.isnan(fajr) | (_fix(sunrise - fajr, 24) > portion)), sunrise - portion, fajr)
+        portion = isha_a / 60 * night
+        has_angle = ~np.isnan(isha_a)
+        isha = np.where(valid & has_angle & (np.isnan(isha) | (_fix(isha - sunset, 24) > portion)), sunset + portion, isha)
+        portion = maghrib_a / 60 * night
+        has_maghrib = ~np.isnan(maghrib_a)
+        maghrib = np.where(valid & has_maghrib & (np.isnan(maghrib) | (_fix(maghrib - sunset, 24) > portion)),
+                           sunset + portion, maghrib)
+
+    minutes = np.broadcast_to(isha_m, fajr.shape)
+    if np.any(ramadan):
+        in_ramadan = np.broadcast_to(np.asarray(ramadan, dtype=bool).reshape(-1, 1, 1) if np.ndim(ramadan) else ramadan, fajr.shape)
+        is_uq = np.array([m == 4 for m in methods])
+        minutes = np.where(in_ramadan & is_uq & ~np.isnan(isha_m), 120, minutes)
+    isha = np.where(np.isnan(isha_m), isha, maghrib + minutes / 60)
+
+    shape = fajr.shape
+    sunrise, sunset, dhuhr, asr = (np.broadcast_to(a, shape) for a in (sunrise, sunset, dhuhr, asr))
+    until = np.where(jafari, fajr, sunrise)
+    return {
+        'Fajr': fajr, 'Sunrise': sunrise, 'Dhuhr': dhuhr, 'Asr': asr, 'Sunset': sunset,
+        'Maghrib': maghrib, 'Isha': isha, 'Imsak': fajr - 10 / 60,
+        'Midnight': sunset + _fix(until - sunset, 24) / 2,
+    }
+
+def to_minutes(hours):
+    """Rounded minutes since local midnight as int16, -1 where the time doesn't occur."""
+    with np.errstate(invalid="ignore"):
+        m = np.floor(_fix(hours, 24) * 60 + 0.5) % 1440
+    return np.where(np.isnan(m), -1, m).astype(np.int16)
+
+def timings(result, i, j=0, k=0):
+    """One cell of compute()'s result as an aladhan-style {"Fajr": "HH:MM", ...} dict."""
+    out = {}
+    for p in PRAYERS:
+        m = int(to_minutes(result[p][i, j, k]))
+        out[p] = "--:--" if m < 0 else f"{m // 60:02}:{m % 60:02}"
+    return out